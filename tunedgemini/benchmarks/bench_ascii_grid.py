@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""
+Throughput of AsciiGrid construction and score_batch on random drawings.
+"""
+
+import argparse
+import random
+import time
+
+from tunedgemini.ascii_grid import AsciiGrid, score_batch
+
+_CHARS = " /\\|_-o.()<>^*#="
+
+
+def random_drawing(rnd, max_height, max_width):
+    height = rnd.randint(3, max_height)
+    return "\n".join(
+        "".join(rnd.choice(_CHARS) for _ in range(rnd.randint(1, max_width))) for _ in range(height)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drawings", type=int, default=5000)
+    parser.add_argument("--max-height", type=int, default=30)
+    parser.add_argument("--max-width", type=int, default=60)
+    parser.add_argument("--max-shift", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    generated = [random_drawing(rnd, args.max_height, args.max_width) for _ in range(args.drawings)]
+    target = [random_drawing(rnd, args.max_height, args.max_width) for _ in range(args.drawings)]
+
+    start = time.perf_counter()
+    generated, target = AsciiGrid.from_texts(generated), AsciiGrid.from_texts(target)
+    built = time.perf_counter()
+    scores = score_batch(generated, target, max_shift=args.max_shift)
+    scored = time.perf_counter()
+
+    print(f"{args.drawings} pairs: build {built - start:.2f}s, score {scored - built:.2f}s "
+          f"({args.drawings / (scored - built):,.0f} pairs/s)")
+    print(scores.mean().round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
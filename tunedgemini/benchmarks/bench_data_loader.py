@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks for the data_loader hot paths on synthetic corpora.
+
+Each stage is timed (best of --repeat) and, unless --no-memory is given, run
+once more under tracemalloc for its peak allocation. Results are written as
+JSON and compared against the baseline committed next to this script
+(baseline_data_loader.json, refreshed with --save-baseline).
+
+Absolute timings depend on the machine, so the comparison is on each stage's
+time relative to the reference implementation (preprocess_row) measured in
+the same run. The script exits non-zero if any stage's relative time grew by
+more than --threshold, and with status 2 if there is no baseline to compare
+against (--no-compare skips the comparison). If the baseline was recorded
+with a different Python or pandas version, the comparison is only reported.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from synthetic import synthetic_newsgroups
+from tunedgemini.data_loader import (
+    preprocess_newsgroup_data,
+    preprocess_newsgroup_row,
+    preprocess_newsgroup_row_fast,
+    sample_data,
+    sample_indices,
+)
+from tunedgemini.fine_tune import tuning_examples
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline_data_loader.json")
+CLASSES_TO_KEEP = "^rec|^sci"
+# Differences below this are timer noise, whatever the ratio.
+MIN_REGRESSION_SECONDS = 0.005
+# Other stages are timed relative to this one, which always runs.
+REFERENCE_STAGE = "preprocess_row"
+
+
+def stages(dataset, df):
+    """Map stage name to a zero-arg callable exercising it."""
+    # load_data keeps 50 per class; small corpora may not have that many.
+    num_samples = max(1, min(50, len(dataset.data) // (2 * len(dataset.target_names))))
+    return {
+        "preprocess_row": lambda: [preprocess_newsgroup_row(text) for text in dataset.data],
+        "preprocess_row_fast": lambda: [preprocess_newsgroup_row_fast(text) for text in dataset.data],
+        "preprocess_data": lambda: preprocess_newsgroup_data(dataset),
+        "sample_data": lambda: sample_data(df, num_samples, CLASSES_TO_KEEP, seed=0),
+        "sample_indices": lambda: sample_indices(dataset.target, dataset.target_names, num_samples, CLASSES_TO_KEEP),
+        "tuning_examples": lambda: tuning_examples(df),
+    }
+
+
+def measure(fn, repeat, memory):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    result = {"seconds": min(timings)}
+    if memory:
+        tracemalloc.start()
+        fn()
+        result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result
+
+
+def run(sizes, repeat, memory, selected, max_unique):
+    results = {}
+    for size in sizes:
+        dataset = synthetic_newsgroups(size, seed=0, max_unique=max_unique)
+        df = preprocess_newsgroup_data(dataset)
+        df["Class Name"] = df["Class Name"].astype("category")
+        for name, fn in stages(dataset, df).items():
+            if selected and name not in selected and name != REFERENCE_STAGE:
+                continue
+            results.setdefault(str(size), {})[name] = measure(fn, repeat, memory)
+            r = results[str(size)][name]
+            peak = f"{r['peak_mb']:9.1f} MB" if "peak_mb" in r else ""
+            print(f"{size:>9} {name:<20} {r['seconds']:9.4f}s {peak}")
+    return results
+
+
+def _version(report, key):
+    return ".".join(str(report.get(key, "")).split(".")[:2])
+
+
+def compare(results, baseline, threshold):
+    """Print per-stage ratios against baseline and return the regressions.
+
+    Both runs are scaled by their own REFERENCE_STAGE time, so the ratio is
+    of relative speed and does not depend on how fast either machine is.
+    """
+    regressions = []
+    for size, stage_results in results.items():
+        base_results = baseline.get(size, {})
+        reference, base_reference = stage_results.get(REFERENCE_STAGE), base_results.get(REFERENCE_STAGE)
+        if not reference or not base_reference:
+            continue
+        for name, r in stage_results.items():
+            base = base_results.get(name)
+            if not base or name == REFERENCE_STAGE:
+                continue
+            expected = base["seconds"] / base_reference["seconds"] * reference["seconds"]
+            ratio = r["seconds"] / expected
+            slower = r["seconds"] - expected > MIN_REGRESSION_SECONDS
+            flag = "REGRESSION" if ratio > 1 + threshold and slower else ""
+            print(f"{size:>9} {name:<20} {ratio:6.2f}x baseline {flag}")
+            if flag:
+                regressions.append((size, name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--stages", nargs="+", help="Only run these stages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--max-unique", type=int, default=20_000,
+                        help="Distinct synthetic posts to generate; larger corpora reuse them")
+    parser.add_argument("--out", default="bench_data_loader.json", help="Where to write results")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing")
+    parser.add_argument("--no-compare", action="store_true", help="Only record results, don't check a baseline")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, not args.no_memory, args.stages, args.max_unique)
+    report = {
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if args.no_compare:
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; create one with --save-baseline or pass --no-compare",
+              file=sys.stderr)
+        sys.exit(2)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline["results"], args.threshold)
+    mismatched = [key for key in ("python", "pandas") if _version(baseline, key) != _version(report, key)]
+    if regressions and mismatched:
+        print(f"Baseline was recorded with a different {' and '.join(mismatched)}; not failing",
+              file=sys.stderr)
+    elif regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
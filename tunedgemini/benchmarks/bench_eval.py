@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+End-to-end throughput benchmark of the evaluation and tuning code against the
+in-process fake Gemini client, so no credentials are needed.
+
+The real eval_model / fine_tune / get_tuned_model functions are driven
+against a FakeClient with configurable latency, injected 429/503 errors and
+a rate limit. Reports requests/s, p50/p95/p99 service latency and how many
+calls were retried.
+"""
+
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from synthetic import synthetic_newsgroups
+from tunedgemini.data_loader import preprocess_texts
+from tunedgemini.fake_client import FakeClient, FakeClock, SimulatedTunings, lognormal_latency
+from tunedgemini.fine_tune import fine_tune, get_tuned_model
+from tunedgemini.predict_eval import eval_model
+
+
+def make_eval_frame(n_posts, seed):
+    dataset = synthetic_newsgroups(n_posts, seed=seed)
+    df = pd.DataFrame({"Text": preprocess_texts(dataset.data), "Label": dataset.target})
+    df["Class Name"] = pd.Series([dataset.target_names[l] for l in dataset.target], dtype="category")
+    return df
+
+
+def make_client(df, args):
+    # Answer with the true label so accuracy doubles as a correctness check.
+    truth = dict(zip(df["Text"], df["Class Name"].astype(str)))
+    return FakeClient(
+        responder=lambda model, contents, config: truth.get(contents, ""),
+        latency=lognormal_latency(args.latency_median, args.latency_sigma, seed=args.seed),
+        error_rates={429: args.error_429, 503: args.error_503},
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        seed=args.seed,
+    )
+
+
+def bench_eval(df, args, concurrency):
+    client = make_client(df, args)
+    start = time.perf_counter()
+    result = eval_model(client, df, "fake-model", num_samples=None, concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+
+    stats = client.stats()
+    return {
+        "concurrency": concurrency or 1,
+        "posts": len(df),
+        "seconds": elapsed,
+        "requests_per_second": stats["calls"] / elapsed,
+        "predictions_per_second": len(df) / elapsed,
+        "p50": stats["p50"],
+        "p95": stats["p95"],
+        "p99": stats["p99"],
+        "retries": stats["calls"] - stats["by_status"].get(200, 0),
+        "by_status": stats["by_status"],
+        "accuracy": float((result["Class Name"] == result["Prediction"]).mean()),
+    }
+
+
+def bench_tuning(df, args):
+    clock = FakeClock()
+    tunings = SimulatedTunings(clock, queue_seconds=args.queue_seconds, train_seconds=args.train_seconds)
+    client = FakeClient(tunings=tunings)
+    started = clock.now()
+    model_id = fine_tune(client, df, base_model="fake-model")
+    get_tuned_model(client, model_id, max_wait=None, clock=clock)
+    return {
+        "simulated_seconds": (clock.now() - started).total_seconds(),
+        "status_polls": tunings.get_calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32],
+                        help="Requests in flight; 1 runs the synchronous predict loop")
+    parser.add_argument("--latency-median", type=float, default=0.05)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-429", type=float, default=0.0)
+    parser.add_argument("--error-503", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests per second before 429s")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--queue-seconds", type=float, default=120)
+    parser.add_argument("--train-seconds", type=float, default=900)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    df = make_eval_frame(args.posts, args.seed)
+    results = {"eval": [bench_eval(df, args, c if c > 1 else None) for c in args.concurrency]}
+    results["tuning"] = bench_tuning(df, args)
+
+    print(f"\n{'conc':>5} {'req/s':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'retries':>8} {'acc':>6}")
+    for r in results["eval"]:
+        print(f"{r['concurrency']:>5} {r['requests_per_second']:8.1f} {r['p50']:7.3f} {r['p95']:7.3f} "
+              f"{r['p99']:7.3f} {r['retries']:>8} {r['accuracy']:6.1%}")
+    tuning = results["tuning"]
+    print(f"\nTuning: {tuning['simulated_seconds']:.0f}s simulated, {tuning['status_polls']} status polls")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Benchmark preprocess_newsgroup_data against the original Series.apply path.
+
+Runs over the full 20 Newsgroups train+test split by default, or a synthetic
+corpus with --synthetic N when the dataset is not available.
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from tunedgemini.data_loader import preprocess_newsgroup_row, preprocess_texts
+
+
+def load_corpus(args):
+    if args.synthetic:
+        from synthetic import synthetic_newsgroups
+        return synthetic_newsgroups(args.synthetic, seed=args.seed).data
+
+    from sklearn.datasets import fetch_20newsgroups
+    return fetch_20newsgroups(subset="train").data + fetch_20newsgroups(subset="test").data
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic posts instead of the real corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = load_corpus(args)
+    print(f"Corpus: {len(texts)} documents, {sum(map(len, texts)) / 1e6:.1f}M chars")
+
+    baseline, expected = best_of(args.repeat, lambda: pd.Series(texts).apply(preprocess_newsgroup_row).tolist())
+    print(f"{'reference':>12}: {baseline:7.3f}s")
+
+    for workers in args.workers:
+        elapsed, result = best_of(
+            args.repeat, lambda: preprocess_texts(texts, workers=workers, chunk_size=args.chunk_size)
+        )
+        status = "identical" if result == expected else "MISMATCH"
+        print(f"{workers:>4} workers: {elapsed:7.3f}s  {baseline / elapsed:5.2f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+End-to-end hyperparameter sweep against simulated tuning jobs.
+
+Tuning jobs run on a SimulatedTunings backend with a FakeClock, taking longer
+for more epochs and smaller batches, and each tuned model answers with an
+accuracy that depends on its config. Runs the same grid with and without
+pruning and reports the leaderboard, eval requests spent and wall time.
+"""
+
+import argparse
+import time
+
+from bench_eval import make_eval_frame
+from tunedgemini.fake_client import FakeClient, FakeClock, SimulatedTunings, tuned_model_responder
+from tunedgemini.sweep import grid_search, log_uniform, random_search, run_sweep
+
+
+def simulated_accuracy(config):
+    # More epochs help up to a point; learning rates far from 1x hurt.
+    lr = config.learning_rate_multiplier or 1.0
+    epochs = config.epoch_count or 2
+    return max(0.05, min(0.95, 0.55 + 0.12 * min(epochs, 4) - 0.25 * abs(lr - 1.0)))
+
+
+def simulated_durations(n_examples, queue_seconds):
+    def durations(config):
+        steps = (config.epoch_count or 2) * n_examples / (config.batch_size or 16)
+        return queue_seconds, 60 + 2.0 * steps
+    return durations
+
+
+def run(df_train, df_test, configs, args, prune):
+    clock = FakeClock()
+    tunings = SimulatedTunings(clock, durations=simulated_durations(len(df_train), args.queue_seconds))
+    answers = dict(zip(df_test["Text"], df_test["Class Name"].astype(str)))
+    client = FakeClient(responder=tuned_model_responder(tunings, answers, simulated_accuracy, seed=args.seed),
+                        latency=args.latency, tunings=tunings)
+    start = time.perf_counter()
+    board = run_sweep(client, df_train, df_test, configs, base_model="fake-model",
+                      max_concurrent=args.max_concurrent, num_samples=args.num_samples, clock=clock,
+                      seed=args.seed, prune=prune, price_per_million=args.price_per_million)
+    return board, client.calls, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--train-posts", type=int, default=400)
+    parser.add_argument("--test-posts", type=int, default=2000)
+    parser.add_argument("--num-samples", type=int, default=10, help="Eval posts per class")
+    parser.add_argument("--max-concurrent", type=int, default=2)
+    parser.add_argument("--random", type=int, default=0, help="Random search with this many configs, not a grid")
+    parser.add_argument("--queue-seconds", type=float, default=120)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--price-per-million", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df_train = make_eval_frame(args.train_posts, args.seed)
+    df_test = make_eval_frame(args.test_posts, args.seed + 1)
+    if args.random:
+        configs = random_search({"epoch_count": [1, 2, 3, 4, 5], "batch_size": [8, 16, 32],
+                                 "learning_rate_multiplier": log_uniform(0.25, 4.0)}, args.random, seed=args.seed)
+    else:
+        configs = grid_search({"epoch_count": [1, 2, 4], "batch_size": [8, 16],
+                               "learning_rate_multiplier": [0.5, 1.0, 2.0]})
+
+    results = {}
+    for prune in (False, True):
+        print(f"\n=== {len(configs)} configs, pruning {'on' if prune else 'off'} ===")
+        results[prune] = run(df_train, df_test, configs, args, prune)
+
+    (full, full_calls, full_seconds), (pruned, pruned_calls, pruned_seconds) = results[False], results[True]
+    best_full = full.iloc[0]
+    best_pruned = pruned.iloc[0]
+    print(f"\nNo pruning: {full_calls} eval requests, {full_seconds:.2f}s; best trial {best_full['trial']} "
+          f"at {best_full['accuracy']:.1%}")
+    print(f"Pruning:    {pruned_calls} eval requests, {pruned_seconds:.2f}s; best trial {best_pruned['trial']} "
+          f"at {best_pruned['accuracy']:.1%}, {int((pruned['state'] == 'PRUNED').sum())} trials pruned")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Synthetic 20 Newsgroups-shaped corpora, so benchmarks run without downloads.
+"""
+
+import random
+
+from sklearn.utils import Bunch
+
+TARGET_NAMES = [
+    "alt.atheism", "comp.graphics", "comp.os.ms-windows.misc",
+    "comp.sys.ibm.pc.hardware", "comp.sys.mac.hardware", "comp.windows.x",
+    "misc.forsale", "rec.autos", "rec.motorcycles", "rec.sport.baseball",
+    "rec.sport.hockey", "sci.crypt", "sci.electronics", "sci.med", "sci.space",
+    "soc.religion.christian", "talk.politics.guns", "talk.politics.mideast",
+    "talk.politics.misc", "talk.religion.misc",
+]
+
+_WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or "
+    "engine orbit hockey game car team launch patient doctor key encryption "
+    "window driver card disk bike ride season goal shuttle nasa drug study"
+).split()
+
+
+def _sentence(rnd):
+    words = [rnd.choice(_WORDS) for _ in range(rnd.randint(6, 18))]
+    if rnd.random() < 0.1:
+        words.insert(rnd.randrange(len(words)), f"{rnd.choice(_WORDS)}@{rnd.choice(_WORDS)}.edu")
+    return " ".join(words).capitalize() + "."
+
+
+def synthetic_post(rnd, idx):
+    # Body lengths are heavy-tailed like the real corpus: mostly a few lines,
+    # occasionally long enough to hit the truncation limit.
+    n_lines = int(rnd.lognormvariate(2.5, 1.0)) + 1
+    if rnd.random() < 0.002:
+        n_lines *= 200
+    lines = [_sentence(rnd) for _ in range(n_lines)]
+    if rnd.random() < 0.4:
+        author = f"user{rnd.randrange(10_000)}@host{rnd.randrange(100)}.edu"
+        quoted = [f"> {_sentence(rnd)}" for _ in range(rnd.randint(1, 8))]
+        lines = [f"In article <{idx}@news.edu>, {author} writes:"] + quoted + [""] + lines
+    if rnd.random() < 0.3:
+        lines += ["-- ", f"User {idx}", f"user{idx}@example.com | Example University"]
+
+    headers = [
+        f"From: user{idx}@example.com (User {idx})",
+        f"Subject: Re: {' '.join(rnd.choice(_WORDS) for _ in range(4))}",
+        "Organization: Example University",
+        f"Lines: {len(lines)}",
+    ]
+    return "\n".join(headers) + "\n\n" + "\n".join(lines) + "\n"
+
+
+def synthetic_newsgroups(n_docs, seed=0, max_unique=None):
+    """Return a fetch_20newsgroups-like Bunch with n_docs synthetic posts.
+
+    With max_unique set, only that many distinct posts are generated and
+    reused, which keeps building million-document corpora fast.
+    """
+    rnd = random.Random(seed)
+    n_unique = n_docs if max_unique is None else min(n_docs, max_unique)
+    posts = [synthetic_post(rnd, i) for i in range(n_unique)]
+    return Bunch(
+        data=[posts[i % n_unique] for i in range(n_docs)],
+        target=[rnd.randrange(len(TARGET_NAMES)) for _ in range(n_docs)],
+        target_names=list(TARGET_NAMES),
+    )
@@ -9,7 +9,12 @@ from google import genai
 # import something from tunedgemini 
 from tunedgemini.data_loader import  sample_data, load_data
 from tunedgemini.fine_tune import fine_tune, get_tuned_model
-from tunedgemini.predict_eval import  eval_model, eval_tuned_model
+from tunedgemini.predict_eval import  eval_models
+from tunedgemini.prediction_cache import PredictionCache
+from tunedgemini.eval_checkpoint import EvalCheckpoint
+from tunedgemini.model_registry import ModelRegistry
+from tunedgemini.metrics import METRICS
+from tunedgemini.token_budget import apply_token_budget
 
 # Load environment variables from .env file
 dotenv.load_dotenv()
@@ -18,6 +23,13 @@ You are a classification service. You will be passed input that represents
 a newsgroup post and you must respond with the newsgroup from which the post
 originates.
 """
+# Number of generate_content requests kept in flight during evaluation.
+EVAL_CONCURRENCY = 8
+# Fixed so the train/test samples are the same on every run and machine.
+SAMPLE_SEED = 0
+# Per-post token budget after quoted replies and signatures are stripped.
+MAX_POST_TOKENS = 2000
+
 def setup_gemini_client():
     """Test connection to Gemini models on Vertex AI."""
     # Check if credentials are properly set
@@ -54,16 +66,30 @@ def setup_gemini_client():
 
 if __name__ == "__main__":
     client = setup_gemini_client()
-    df_train, df_test = load_data()
+    df_train, df_test = load_data(lazy=True, seed=SAMPLE_SEED)
+    df_train = apply_token_budget(df_train, MAX_POST_TOKENS)
+    df_test = apply_token_budget(df_test, MAX_POST_TOKENS)
+    # Set TUNEDGEMINI_NO_CACHE=1 to force fresh predictions.
+    cache = PredictionCache(bypass=os.environ.get("TUNEDGEMINI_NO_CACHE") == "1")
+    # Set TUNEDGEMINI_CHECKPOINT to a file path to make the evaluations resumable.
+    checkpoint_path = os.environ.get("TUNEDGEMINI_CHECKPOINT")
+    checkpoint = EvalCheckpoint(checkpoint_path) if checkpoint_path else None
 
 
-    df_baseline_eval = eval_model(client, df_test, "gemini-1.5-flash-001")
-    model_id = fine_tune(client, df_train, base_model="gemini-1.5-flash-001")
-    tuned_model = get_tuned_model(client, model_id)
+    registry = ModelRegistry()
+    model_id = fine_tune(client, df_train, base_model="gemini-1.5-flash-001", registry=registry)
+    tuned_model = get_tuned_model(client, model_id, registry=registry)
     print(f"Done! The model state is: {tuned_model.state.name}")
     # The sampling here is just to minimise your quota usage. If you can, you should
-    # evaluate the whole test set with `df_model_eval = df_test.copy()`.
+    # evaluate the whole test set with `num_samples=None`.
     
     
-    df_tuned_eval = eval_tuned_model(client, df_test, model_id)
+    # Score both models on one shared sample, so the comparison is paired.
+    df_compare = eval_models(client, df_test, ["gemini-1.5-flash-001", model_id], concurrency=EVAL_CONCURRENCY,
+                             cache=cache, checkpoint=checkpoint, seed=SAMPLE_SEED)
+    print(f"Prediction cache: {cache.stats()}")
+
+    # Set TUNEDGEMINI_METRICS=1 to collect these; a .prom path gives Prometheus text.
+    if METRICS.enabled:
+        METRICS.export(os.environ.get("TUNEDGEMINI_METRICS_PATH", "metrics.json"))
     
@@ -0,0 +1,132 @@
+"""
+ASCII art generation with a base or tuned Gemini model.
+
+stream_ascii uses the streaming API and hands each line to a callback as
+soon as it is complete, so drawings appear while they are generated. A
+stream is cancelled once the drawing outgrows max_width x max_height, which
+stops a runaway answer from spending more output tokens.
+"""
+
+import time
+
+from google.api_core import retry
+from google.genai import types
+
+from tunedgemini.metrics import METRICS
+from tunedgemini.predict_eval import _generate, is_retriable
+
+ascii_instruct = """
+You draw ASCII art. Respond with the drawing only, using printable ASCII
+characters, with no surrounding prose or code fences.
+"""
+
+
+def _ascii_config(temperature=None, max_output_tokens=None):
+    return types.GenerateContentConfig(
+        system_instruction=ascii_instruct, temperature=temperature, max_output_tokens=max_output_tokens)
+
+
+def _strip_fences(text):
+    lines = text.strip("\n").splitlines()
+    if lines and lines[0].startswith("```"):
+        lines = lines[1:]
+    if lines and lines[-1].startswith("```"):
+        lines = lines[:-1]
+    return "\n".join(lines)
+
+
+def generate_ascii(client, model_id, prompt, temperature=None):
+    """Draw `prompt` as ASCII art and return the text of the drawing."""
+    response = _generate(client, model_id, f"Draw {prompt}", config=_ascii_config(temperature))
+    return _strip_fences(response.text or "")
+
+
+class StreamResult:
+    """The lines of a streamed drawing and how quickly they arrived."""
+
+    def __init__(self):
+        self.lines = []
+        self.chunks = 0
+        self.stop_reason = None
+        self.time_to_first_line = None
+        self.total_seconds = None
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    @property
+    def lines_per_second(self):
+        return len(self.lines) / self.total_seconds if self.total_seconds else 0.0
+
+    def summary(self):
+        first = "n/a" if self.time_to_first_line is None else f"{self.time_to_first_line:.2f}s"
+        return (f"{len(self.lines)} lines, first line {first}, total {self.total_seconds:.2f}s, "
+                f"{self.lines_per_second:.1f} lines/s, stopped: {self.stop_reason}")
+
+
+@retry.Retry(predicate=is_retriable, on_error=METRICS.record_retry)
+def _open_stream(client, model_id, contents, config):
+    # Errors surface on the first chunk, so that is the part worth retrying.
+    stream = client.models.generate_content_stream(model=model_id, contents=contents, config=config)
+    return next(stream, None), stream
+
+
+def stream_ascii(client, model_id, prompt, max_width=80, max_height=40, on_line=print, temperature=None):
+    """Stream a drawing of `prompt`, calling on_line(line) for each finished line.
+
+    Code fences and leading blank lines are dropped. Returns a StreamResult;
+    its stop_reason is "finished", "blocked", "max_width" or "max_height".
+    """
+    result = StreamResult()
+    start = time.perf_counter()
+    metrics_start = METRICS.request_start()
+    chunk, stream = _open_stream(client, model_id, f"Draw {prompt}", _ascii_config(temperature))
+    buffer = ""
+
+    def emit(line):
+        if line.startswith("```") or (not result.lines and not line.strip()):
+            return None
+        if len(result.lines) == max_height:
+            return "max_height"
+        # A too-wide line is kept, cut to max_width, and ends the drawing.
+        reason = None
+        if len(line) > max_width:
+            line, reason = line[:max_width], "max_width"
+        result.lines.append(line)
+        if result.time_to_first_line is None:
+            result.time_to_first_line = time.perf_counter() - start
+        on_line(line)
+        return reason
+
+    try:
+        while chunk is not None and result.stop_reason is None:
+            result.chunks += 1
+            candidate = chunk.candidates[0] if chunk.candidates else None
+            if candidate is not None and candidate.finish_reason not in (None, types.FinishReason.STOP,
+                                                                          types.FinishReason.MAX_TOKENS):
+                result.stop_reason = "blocked"
+                break
+            *complete, buffer = (buffer + (chunk.text or "")).split("\n")
+            for line in complete:
+                result.stop_reason = emit(line.rstrip())
+                if result.stop_reason:
+                    break
+            # A line that is already too wide will not get narrower.
+            if result.stop_reason is None and len(buffer.rstrip()) > max_width:
+                result.stop_reason = emit(buffer.rstrip())
+            chunk = next(stream, None)
+        else:
+            if result.stop_reason is None and buffer.strip():
+                result.stop_reason = emit(buffer.rstrip())
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+    while result.lines and not result.lines[-1].strip():
+        result.lines.pop()
+    result.stop_reason = result.stop_reason or "finished"
+    result.total_seconds = time.perf_counter() - start
+    METRICS.record_request(model_id, metrics_start)
+    return result
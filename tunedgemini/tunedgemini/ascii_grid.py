@@ -0,0 +1,185 @@
+"""
+NumPy representation of ASCII drawings and vectorized similarity scoring.
+
+An AsciiGrid holds a batch of drawings as one (n, height, width) uint8 array
+padded with spaces, plus each drawing's own height and width, so the ragged
+originals can be recovered. score_batch compares generated drawings with
+their targets across the whole batch at once:
+
+- char_iou: cells where both have the same non-space character, over cells
+  where either has ink;
+- ink_iou: the same for ink coverage, ignoring which character;
+- ssim: structural similarity of character density maps (3x3 windows);
+- edge_similarity: cosine similarity of density gradients;
+- aligned_char_iou: best char_iou over shifts of up to max_shift cells,
+  with the shift that achieved it.
+"""
+
+import numpy as np
+import pandas as pd
+
+SPACE = ord(" ")
+
+# Rough ink density per character, for the structural and edge scores.
+_DENSITY_RAMP = " .'`,:;-_~\"^!i|/\\()[]{}<>+=?7tlfrcjxvzuno1IJLYTCsea23ZkhbdpqwmgyQOUXKAVSPDG5EFHR4N$89&0%#BWM@"
+DENSITY = np.full(256, 0.5, dtype=np.float32)
+DENSITY[:32] = 0.0
+for _i, _c in enumerate(_DENSITY_RAMP):
+    DENSITY[ord(_c)] = _i / (len(_DENSITY_RAMP) - 1)
+
+
+def _lines(text):
+    lines = text.expandtabs(4).encode("ascii", "replace").decode("ascii").split("\n")
+    lines = [line.rstrip() for line in lines]
+    while lines and not lines[0]:
+        lines.pop(0)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+class AsciiGrid:
+    """A batch of drawings as an (n, height, width) uint8 array padded with spaces."""
+
+    def __init__(self, cells, heights, widths):
+        self.cells = cells
+        self.heights = heights
+        self.widths = widths
+
+    @classmethod
+    def from_texts(cls, texts, max_height=200, max_width=200):
+        """Build a batch from drawing strings, cropping each to max_height x max_width."""
+        all_lines = [[line[:max_width] for line in _lines(text)[:max_height]] for text in texts]
+        heights = np.array([len(lines) for lines in all_lines], dtype=np.int32)
+        widths = np.array([max(map(len, lines), default=0) for lines in all_lines], dtype=np.int32)
+        cells = np.full((len(all_lines), max(heights, default=0), max(widths, default=0)), SPACE, dtype=np.uint8)
+        for i, lines in enumerate(all_lines):
+            for j, line in enumerate(lines):
+                if line:
+                    cells[i, j, :len(line)] = np.frombuffer(line.encode("ascii"), dtype=np.uint8)
+        return cls(cells, heights, widths)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __getitem__(self, i):
+        rows = self.cells[i, :self.heights[i], :self.widths[i]]
+        return "\n".join(row.tobytes().decode("ascii").rstrip() for row in rows)
+
+    def to_texts(self):
+        return [self[i] for i in range(len(self))]
+
+    def chunk(self, start, stop):
+        """Drawings start:stop, with padding cropped to the largest of them."""
+        heights, widths = self.heights[start:stop], self.widths[start:stop]
+        cells = self.cells[start:stop, :max(heights, default=0), :max(widths, default=0)]
+        return AsciiGrid(cells, heights, widths)
+
+    @property
+    def ink(self):
+        return self.cells != SPACE
+
+    def padded(self, height, width):
+        """The cell array padded with spaces to (n, height, width)."""
+        n, h, w = self.cells.shape
+        out = np.full((n, height, width), SPACE, dtype=np.uint8)
+        out[:, :h, :w] = self.cells
+        return out
+
+
+def _ratio(num, den):
+    # Two empty drawings are identical.
+    return np.where(den > 0, num / np.maximum(den, 1), 1.0)
+
+
+def _box3(x):
+    """Mean over each cell's 3x3 neighbourhood, for a batch of 2D maps."""
+    p = np.pad(x, ((0, 0), (1, 1), (1, 1)))
+    h, w = x.shape[1:]
+    return sum(p[:, dy:dy + h, dx:dx + w] for dy in range(3) for dx in range(3)) / 9.0
+
+
+def _ssim(a, b, region):
+    c1, c2 = 0.01 ** 2, 0.03 ** 2
+    mu_a, mu_b = _box3(a), _box3(b)
+    var_a = _box3(a * a) - mu_a * mu_a
+    var_b = _box3(b * b) - mu_b * mu_b
+    cov = _box3(a * b) - mu_a * mu_b
+    ssim = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return _ratio((ssim * region).sum(axis=(1, 2)), region.sum(axis=(1, 2)))
+
+
+def _edge_similarity(a, b):
+    def gradients(x):
+        gx = np.diff(x, axis=2, append=0)
+        gy = np.diff(x, axis=1, append=0)
+        return gx, gy
+
+    ax, ay = gradients(a)
+    bx, by = gradients(b)
+    dot = (ax * bx + ay * by).sum(axis=(1, 2))
+    norm_a = np.sqrt((ax * ax + ay * ay).sum(axis=(1, 2)))
+    norm_b = np.sqrt((bx * bx + by * by).sum(axis=(1, 2)))
+    both_flat = (norm_a == 0) & (norm_b == 0)
+    return np.where(both_flat, 1.0, dot / np.maximum(norm_a * norm_b, 1e-12))
+
+
+def _char_iou(a, b):
+    ink_a, ink_b = a != SPACE, b != SPACE
+    union = (ink_a | ink_b).sum(axis=(1, 2))
+    return _ratio(((a == b) & ink_a).sum(axis=(1, 2)), union)
+
+
+def score_batch(generated, target, max_shift=2, chunk_size=1024):
+    """Score generated drawings against targets, pairwise; returns a DataFrame.
+
+    Both arguments are AsciiGrids (or lists of strings) of the same length.
+    Drawings are scored chunk_size at a time to bound memory.
+    """
+    if not isinstance(generated, AsciiGrid):
+        generated = AsciiGrid.from_texts(generated)
+    if not isinstance(target, AsciiGrid):
+        target = AsciiGrid.from_texts(target)
+    if len(generated) != len(target):
+        raise ValueError("generated and target must hold the same number of drawings")
+    if len(generated) > chunk_size:
+        return pd.concat([
+            _score_chunk(generated.chunk(i, i + chunk_size), target.chunk(i, i + chunk_size), max_shift)
+            for i in range(0, len(generated), chunk_size)
+        ], ignore_index=True)
+    return _score_chunk(generated, target, max_shift)
+
+
+def _score_chunk(generated, target, max_shift):
+    # Pad by max_shift on every side so shifting only ever moves in blank cells.
+    height = max(generated.cells.shape[1], target.cells.shape[1]) + 2 * max_shift
+    width = max(generated.cells.shape[2], target.cells.shape[2]) + 2 * max_shift
+    g = np.roll(generated.padded(height, width), (max_shift, max_shift), axis=(1, 2))
+    t = np.roll(target.padded(height, width), (max_shift, max_shift), axis=(1, 2))
+
+    ink_g, ink_t = g != SPACE, t != SPACE
+    union = (ink_g | ink_t).sum(axis=(1, 2))
+    dg, dt = DENSITY[g], DENSITY[t]
+    region = _box3((ink_g | ink_t).astype(np.float32)) > 0
+
+    char_iou = _char_iou(g, t)
+    best, best_dy, best_dx = char_iou.copy(), np.zeros(len(g), int), np.zeros(len(g), int)
+    for dy in range(-max_shift, max_shift + 1):
+        for dx in range(-max_shift, max_shift + 1):
+            if dy == 0 and dx == 0:
+                continue
+            iou = _char_iou(np.roll(g, (dy, dx), axis=(1, 2)), t)
+            better = iou > best
+            best = np.where(better, iou, best)
+            best_dy = np.where(better, dy, best_dy)
+            best_dx = np.where(better, dx, best_dx)
+
+    return pd.DataFrame({
+        "char_iou": char_iou,
+        "ink_iou": _ratio((ink_g & ink_t).sum(axis=(1, 2)), union),
+        "ssim": _ssim(dg, dt, region),
+        "edge_similarity": _edge_similarity(dg, dt),
+        "aligned_char_iou": best,
+        "shift_dy": best_dy,
+        "shift_dx": best_dx,
+    })
@@ -0,0 +1,34 @@
+import asyncio
+
+from tqdm.rich import tqdm as tqdmr
+
+
+async def gather_ordered(items, predict_fn, concurrency=8, desc=None, stop=None):
+    """Run predict_fn over items with at most `concurrency` calls in flight.
+
+    Results are returned in the same order as items. If stop() becomes true,
+    items not yet started are skipped and their results left as None.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    items = list(items)
+    results = [None] * len(items)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    with tqdmr(total=len(items), desc=desc) as progress:
+
+        async def run_one(idx, item):
+            async with semaphore:
+                if stop is None or not stop():
+                    results[idx] = await predict_fn(item)
+            progress.update(1)
+
+        await asyncio.gather(*(run_one(i, item) for i, item in enumerate(items)))
+
+    return results
+
+
+def run_batch(items, predict_fn, concurrency=8, desc=None, stop=None):
+    """Blocking wrapper around gather_ordered for use from scripts."""
+    return asyncio.run(gather_ordered(items, predict_fn, concurrency, desc, stop))
@@ -0,0 +1,64 @@
+"""
+Local TF-IDF classifier used as the first stage of a cascade.
+
+The classifier is trained on the labelled training sample and answers for
+posts where its top-class probability clears a threshold; everything else
+goes to the Gemini model. The threshold is calibrated on cross-validated
+predictions over the training sample, as the lowest confidence at which the
+locally answered posts still reach `target_accuracy`.
+"""
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from sklearn.pipeline import make_pipeline
+
+
+def _make_pipeline():
+    return make_pipeline(
+        TfidfVectorizer(sublinear_tf=True, ngram_range=(1, 2), min_df=2, max_features=100_000),
+        LogisticRegression(C=10.0, max_iter=1000),
+    )
+
+
+def calibrate_threshold(confidence, correct, target_accuracy):
+    """Lowest confidence whose accepted set (conf >= it) is target_accuracy accurate.
+
+    Returns inf, so nothing is answered locally, if no threshold qualifies.
+    """
+    order = np.argsort(-confidence)
+    running = np.cumsum(correct[order]) / np.arange(1, len(order) + 1)
+    ok = np.nonzero(running >= target_accuracy)[0]
+    if len(ok) == 0:
+        return np.inf
+    return float(confidence[order][ok[-1]])
+
+
+class LocalClassifier:
+    def __init__(self, target_accuracy=0.95, folds=5):
+        self.target_accuracy = target_accuracy
+        self.folds = folds
+        self.pipeline = None
+        self.threshold = np.inf
+
+    def fit(self, texts, labels):
+        texts, labels = list(texts), np.asarray(labels, dtype=object)
+        folds = min(self.folds, min(np.unique(labels, return_counts=True)[1]))
+        if folds >= 2:
+            cv = StratifiedKFold(folds, shuffle=True, random_state=0)
+            proba = cross_val_predict(_make_pipeline(), texts, labels, cv=cv, method="predict_proba")
+            classes = np.unique(labels)
+            correct = classes[proba.argmax(axis=1)] == labels
+            self.threshold = calibrate_threshold(proba.max(axis=1), correct, self.target_accuracy)
+        self.pipeline = _make_pipeline().fit(texts, labels)
+        return self
+
+    def predict(self, texts):
+        """Return (labels, confidences) for texts."""
+        proba = self.pipeline.predict_proba(list(texts))
+        classes = self.pipeline.classes_
+        return classes[proba.argmax(axis=1)], proba.max(axis=1)
+
+    def confident(self, confidences):
+        return confidences >= self.threshold
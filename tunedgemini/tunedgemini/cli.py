@@ -0,0 +1,375 @@
+"""
+Command-line interface for tunedgemini.
+
+Only argparse and the standard library are imported at module level. pandas,
+scikit-learn and google-genai are imported inside the subcommand that needs
+them, so `tunedgemini --help` and `tunedgemini config` start quickly;
+`tunedgemini bench startup` checks that against STARTUP_BUDGET_MS.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from tunedgemini.session import (DEFAULT_BASE_MODEL, export_metrics, load_env, load_frames, make_client,
+                                 prediction_cache)
+
+STARTUP_BUDGET_MS = 150
+BENCHMARKS_DIR = Path(__file__).resolve().parent.parent / "benchmarks"
+
+ENV_TEMPLATE = """\
+# Google Cloud credentials
+GOOGLE_APPLICATION_CREDENTIALS=path/to/your/credentials.json
+
+# Google Cloud project settings
+GCP_PROJECT_ID=your-project-id
+GCP_LOCATION=us-central1
+
+# Gemini API key used by the google-genai client
+GOOGLE_API_KEY=your-api-key
+
+# Gemini model settings
+GEMINI_MODEL_NAME=gemini-1.5-pro
+"""
+
+CONFIG_VARS = [
+    "GOOGLE_APPLICATION_CREDENTIALS",
+    "GCP_PROJECT_ID",
+    "GCP_LOCATION",
+    "GOOGLE_API_KEY",
+    "GEMINI_MODEL_NAME",
+    "TUNEDGEMINI_CACHE_DIR",
+]
+
+
+def cmd_config(args):
+    load_env()
+    env_path = Path(".env")
+    if args.create_env:
+        if env_path.exists() and not args.force:
+            print(f"{env_path} already exists; use --force to overwrite it.")
+            return 1
+        env_path.write_text(ENV_TEMPLATE)
+        print(f"Wrote {env_path}. Edit it with your project settings.")
+
+    for name in CONFIG_VARS:
+        value = os.environ.get(name)
+        if value and name == "GOOGLE_API_KEY":
+            value = value[:4] + "..."
+        print(f"{name:<32} {value or '(not set)'}")
+
+    credentials = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+    if credentials and not os.path.exists(credentials):
+        print(f"Credentials file not found at: {credentials}")
+        return 1
+    return 0
+
+
+def cmd_load(args):
+    df_train, df_test = load_frames(args.seed, args.workers, args.max_tokens)
+    for name, df in (("train", df_train), ("test", df_test)):
+        print(f"{name}: {len(df)} posts")
+        print(df["Class Name"].value_counts().sort_index().to_string())
+    if args.out:
+        out = Path(args.out)
+        out.mkdir(parents=True, exist_ok=True)
+        df_train.to_json(out / "train.jsonl", orient="records", lines=True)
+        df_test.to_json(out / "test.jsonl", orient="records", lines=True)
+        print(f"Wrote {out / 'train.jsonl'} and {out / 'test.jsonl'}")
+    return 0
+
+
+def cmd_tune(args):
+    from tunedgemini.fine_tune import fine_tune
+    from tunedgemini.model_registry import ModelRegistry
+
+    df_train, _ = load_frames(args.seed, args.workers, args.max_tokens)
+    registry = ModelRegistry()
+    model_id = fine_tune(make_client(), df_train, base_model=args.base_model,
+                         model_id=args.model_id, registry=registry)
+    print(model_id)
+    export_metrics()
+    return 0
+
+
+def cmd_sweep(args):
+    from tunedgemini.model_registry import ModelRegistry
+    from tunedgemini.sweep import grid_search, log_uniform, random_search, run_sweep
+
+    if args.random:
+        space = {"epoch_count": args.epochs, "batch_size": args.batch_sizes,
+                 "learning_rate_multiplier": log_uniform(min(args.learning_rates), max(args.learning_rates))}
+        configs = random_search(space, args.random, seed=args.seed)
+    else:
+        configs = grid_search({"epoch_count": args.epochs, "batch_size": args.batch_sizes,
+                               "learning_rate_multiplier": args.learning_rates})
+    df_train, df_test = load_frames(args.seed, args.workers, args.max_tokens)
+    board = run_sweep(make_client(), df_train, df_test, configs, base_model=args.base_model,
+                      max_concurrent=args.max_concurrent, num_samples=args.num_samples, seed=args.seed,
+                      prune=not args.no_prune, price_per_million=args.price_per_million,
+                      registry=ModelRegistry(), cache=prediction_cache(args.no_cache))
+    if args.out:
+        board.to_csv(args.out, index=False)
+    export_metrics()
+    return 0
+
+
+def cmd_wait(args):
+    import datetime
+    from tunedgemini.fine_tune import get_tuned_model
+    from tunedgemini.model_registry import ModelRegistry
+
+    max_wait = datetime.timedelta(minutes=args.max_wait) if args.max_wait else None
+    tuned_model = get_tuned_model(make_client(), args.model_id, max_wait=max_wait,
+                                  fallback_model_id=args.fallback, registry=ModelRegistry())
+    export_metrics()
+    return 0 if tuned_model.has_succeeded else 1
+
+
+def cmd_eval(args):
+    from tunedgemini.predict_eval import eval_model, eval_tuned_model
+
+    _, df_test = load_frames(args.seed, args.workers, args.max_tokens)
+    kwargs = {}
+    if args.num_samples is not None:
+        kwargs["num_samples"] = args.num_samples or None
+    cache = prediction_cache(args.no_cache)
+    evaluate = eval_tuned_model if args.model_id.startswith("tunedModels/") else eval_model
+    if args.checkpoint:
+        from tunedgemini.eval_checkpoint import EvalCheckpoint
+        kwargs["checkpoint"] = EvalCheckpoint(args.checkpoint)
+    evaluate(make_client(), df_test, args.model_id, concurrency=args.concurrency, cache=cache,
+             seed=args.seed, ci_width=args.ci_width, constrained=args.constrained, **kwargs)
+    print(f"Prediction cache: {cache.stats()}")
+    export_metrics()
+    return 0
+
+
+def cmd_cascade(args):
+    from tunedgemini.predict_eval import eval_model_cascade
+
+    df_train, df_test = load_frames(args.seed, args.workers, args.max_tokens)
+    eval_model_cascade(make_client(), df_train, df_test, args.model_id, num_samples=args.num_samples or None,
+                       target_accuracy=args.target_accuracy, concurrency=args.concurrency,
+                       cache=prediction_cache(args.no_cache), compare=args.compare, seed=args.seed)
+    export_metrics()
+    return 0
+
+
+def cmd_few_shot(args):
+    from tunedgemini.predict_eval import eval_model_few_shot
+
+    df_train, df_test = load_frames(args.seed, args.workers, args.max_tokens)
+    eval_model_few_shot(make_client(), df_train, df_test, args.model_id, k=args.k,
+                        num_samples=args.num_samples or None, concurrency=args.concurrency,
+                        cache=prediction_cache(args.no_cache), compare_inline=args.compare_inline,
+                        seed=args.seed)
+    export_metrics()
+    return 0
+
+
+def cmd_compare(args):
+    from tunedgemini.predict_eval import compare_models
+
+    _, df_test = load_frames(args.seed, args.workers, args.max_tokens)
+    cache = prediction_cache(args.no_cache)
+    compare_models(make_client(), df_test, args.model_a, args.model_b, num_samples=args.num_samples or None,
+                   concurrency=args.concurrency, cache=cache, alpha=args.alpha, seed=args.seed)
+    export_metrics()
+    return 0
+
+
+def cmd_eval_models(args):
+    from tunedgemini.predict_eval import eval_models
+
+    _, df_test = load_frames(args.seed, args.workers, args.max_tokens)
+    checkpoint = None
+    if args.checkpoint:
+        from tunedgemini.eval_checkpoint import EvalCheckpoint
+        checkpoint = EvalCheckpoint(args.checkpoint)
+    df_eval = eval_models(make_client(), df_test, args.model_ids, num_samples=args.num_samples or None,
+                          concurrency=args.concurrency, cache=prediction_cache(args.no_cache), checkpoint=checkpoint,
+                          seed=args.seed, alpha=args.alpha)
+    if args.out:
+        df_eval.drop(columns=["Text"]).to_csv(args.out, index=False)
+    export_metrics()
+    return 0
+
+
+def cmd_ascii_generate(args):
+    from tunedgemini.ascii_art import generate_ascii, stream_ascii
+
+    client = make_client()
+    for prompt in args.prompt:
+        if args.no_stream:
+            print(generate_ascii(client, args.model_id, prompt, temperature=args.temperature))
+        else:
+            result = stream_ascii(client, args.model_id, prompt, max_width=args.max_width,
+                                  max_height=args.max_height, temperature=args.temperature,
+                                  on_line=lambda line: print(line, flush=True))
+            print(result.summary(), file=sys.stderr)
+        print()
+    return 0
+
+
+def bench_startup(repeat=10):
+    """Wall time in ms of `python -m tunedgemini.cli --help`, best of repeat."""
+    import subprocess
+    import time
+
+    cmd = [sys.executable, "-m", "tunedgemini.cli", "--help"]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def cmd_bench(args):
+    if args.name == "startup":
+        best = bench_startup(args.repeat)
+        print(f"tunedgemini --help: {best:.0f} ms (budget {STARTUP_BUDGET_MS} ms)")
+        return 0 if best <= STARTUP_BUDGET_MS else 1
+
+    import runpy
+    script = BENCHMARKS_DIR / f"bench_{args.name.replace('-', '_')}.py"
+    if not script.exists():
+        print(f"No benchmark {args.name!r} in {BENCHMARKS_DIR}")
+        return 1
+    sys.path.insert(0, str(BENCHMARKS_DIR))
+    sys.argv = [str(script), *args.args]
+    runpy.run_path(str(script), run_name="__main__")
+    return 0
+
+
+def _add_data_args(parser):
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed")
+    parser.add_argument("--workers", type=int, default=1, help="Preprocessing processes")
+    parser.add_argument("--max-tokens", type=int, default=2000,
+                        help="Per-post token budget; 0 keeps posts as they are")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="tunedgemini", description="Fine-tune and evaluate Gemini models.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("config", help="Show configuration, optionally writing a .env template")
+    p.add_argument("--create-env", action="store_true", help="Write a .env file from the template")
+    p.add_argument("--force", action="store_true", help="Overwrite an existing .env")
+    p.set_defaults(func=cmd_config)
+
+    p = sub.add_parser("load", help="Load and sample the 20 Newsgroups train/test sets")
+    _add_data_args(p)
+    p.add_argument("--out", help="Directory to write train.jsonl and test.jsonl to")
+    p.set_defaults(func=cmd_load)
+
+    p = sub.add_parser("tune", help="Start (or reuse) a tuning job and print its model id")
+    _add_data_args(p)
+    p.add_argument("--base-model", default=DEFAULT_BASE_MODEL)
+    p.add_argument("--model-id", help="Reuse this tuned model instead of tuning")
+    p.set_defaults(func=cmd_tune)
+
+    p = sub.add_parser("sweep", help="Tune and evaluate a grid or random sample of hyperparameters")
+    _add_data_args(p)
+    p.add_argument("--base-model", default=DEFAULT_BASE_MODEL)
+    p.add_argument("--epochs", type=int, nargs="+", default=[1, 2, 4])
+    p.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 16])
+    p.add_argument("--learning-rates", type=float, nargs="+", default=[0.5, 1.0, 2.0],
+                   help="Learning rate multipliers; with --random, the range to sample from")
+    p.add_argument("--random", type=int, default=0, help="Sample this many configs instead of the full grid")
+    p.add_argument("--max-concurrent", type=int, default=2, help="Tuning jobs allowed at once")
+    p.add_argument("--num-samples", type=int, default=4, help="Eval posts per class")
+    p.add_argument("--no-prune", action="store_true", help="Evaluate every trial on the full sample")
+    p.add_argument("--price-per-million", type=float, help="Tuning price per million training tokens")
+    p.add_argument("--out", help="Write the leaderboard to this CSV file")
+    p.add_argument("--no-cache", action="store_true", help="Ignore cached predictions")
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("wait", help="Wait for a tuning job to finish")
+    p.add_argument("model_id")
+    p.add_argument("--max-wait", type=float, default=10, help="Minutes to wait; 0 waits indefinitely")
+    p.add_argument("--fallback", help="Model to use instead if the job takes longer than --max-wait")
+    p.set_defaults(func=cmd_wait)
+
+    p = sub.add_parser("eval", help="Evaluate a base or tuned model on the test sample")
+    _add_data_args(p)
+    p.add_argument("model_id")
+    p.add_argument("--num-samples", type=int, default=None,
+                   help="Posts per class; 0 uses the whole test sample")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--no-cache", action="store_true", help="Ignore cached predictions")
+    p.add_argument("--checkpoint", help="Append-only log of predictions; rerun with it to resume")
+    p.add_argument("--ci-width", type=float, help="Stop once the 95%% accuracy interval is narrower than this")
+    p.add_argument("--constrained", action="store_true", help="Restrict answers to the class names (enum schema)")
+    p.set_defaults(func=cmd_eval)
+
+    p = sub.add_parser("cascade", help="Answer confident posts with a local TF-IDF model, the rest remotely")
+    _add_data_args(p)
+    p.add_argument("model_id")
+    p.add_argument("--num-samples", type=int, default=0, help="Posts per class; 0 uses the whole test sample")
+    p.add_argument("--target-accuracy", type=float, default=0.95,
+                   help="Accuracy the locally answered posts must reach in cross-validation")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--compare", action="store_true", help="Also evaluate all posts remotely")
+    p.add_argument("--no-cache", action="store_true", help="Ignore cached predictions")
+    p.set_defaults(func=cmd_cascade)
+
+    p = sub.add_parser("few-shot", help="Evaluate a base model with cached few-shot examples")
+    _add_data_args(p)
+    p.add_argument("model_id", nargs="?", default=DEFAULT_BASE_MODEL)
+    p.add_argument("-k", type=int, default=2,
+                   help="Examples per class; more are added to reach the model's minimum cache size")
+    p.add_argument("--num-samples", type=int, default=2, help="Posts per class; 0 uses the whole test sample")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--compare-inline", action="store_true",
+                   help="Also run with the examples inlined, and report the savings")
+    p.add_argument("--no-cache", action="store_true", help="Ignore cached predictions")
+    p.set_defaults(func=cmd_few_shot)
+
+    p = sub.add_parser("compare", help="Compare two models, stopping once one is significantly better")
+    _add_data_args(p)
+    p.add_argument("model_a")
+    p.add_argument("model_b")
+    p.add_argument("--num-samples", type=int, default=0, help="Posts per class; 0 uses the whole test sample")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--alpha", type=float, default=0.05, help="Significance level of the sequential test")
+    p.add_argument("--no-cache", action="store_true", help="Ignore cached predictions")
+    p.set_defaults(func=cmd_compare)
+
+    p = sub.add_parser("eval-models", help="Evaluate several models on the same sample, with paired tests")
+    _add_data_args(p)
+    p.add_argument("model_ids", nargs="+")
+    p.add_argument("--num-samples", type=int, default=4, help="Posts per class; 0 uses the whole test sample")
+    p.add_argument("--concurrency", type=int, default=8, help="Posts in flight, each sent to every model")
+    p.add_argument("--alpha", type=float, default=0.05, help="Family-wise significance level")
+    p.add_argument("--checkpoint", help="Append-only log of predictions; rerun with it to resume")
+    p.add_argument("--out", help="Write the predictions to this CSV file")
+    p.add_argument("--no-cache", action="store_true", help="Ignore cached predictions")
+    p.set_defaults(func=cmd_eval_models)
+
+    p = sub.add_parser("ascii-generate", help="Draw ASCII art for one or more prompts")
+    p.add_argument("prompt", nargs="+")
+    p.add_argument("--model-id", default=os.environ.get("GEMINI_MODEL_NAME", "gemini-1.5-flash-001"))
+    p.add_argument("--temperature", type=float, default=None)
+    p.add_argument("--max-width", type=int, default=80, help="Cancel the stream past this many columns")
+    p.add_argument("--max-height", type=int, default=40, help="Cancel the stream past this many lines")
+    p.add_argument("--no-stream", action="store_true", help="Wait for the whole drawing instead")
+    p.set_defaults(func=cmd_ascii_generate)
+
+    p = sub.add_parser("bench", help="Run a benchmark: startup, or one of benchmarks/bench_*.py")
+    p.add_argument("name", help="startup, eval, data-loader or preprocess")
+    p.add_argument("--repeat", type=int, default=10, help="Runs for the startup benchmark")
+    p.add_argument("args", nargs=argparse.REMAINDER, help="Arguments passed to the benchmark script")
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
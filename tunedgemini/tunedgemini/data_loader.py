@@ -1,50 +1,136 @@
 from sklearn.datasets import fetch_20newsgroups
+from concurrent.futures import ProcessPoolExecutor
 import email
+import email.parser
+import hashlib
+import os
 import re
+from pathlib import Path
+import numpy as np
 import pandas as pd
 
+from tunedgemini.metrics import timed
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    arrow_available = True
+except ImportError:
+    arrow_available = False
+
+# Bump PREPROCESS_VERSION whenever preprocess_newsgroup_row changes behaviour,
+# so cached frames built by the old code are not reused.
+PREPROCESS_VERSION = 1
+EMAIL_PATTERN = r"[\w\.-]+@[\w\.-]+"
+MAX_TEXT_CHARS = 40000
+
+DATA_CACHE_DIR = Path(
+    os.environ.get("TUNEDGEMINI_CACHE_DIR", Path.home() / ".cache" / "tunedgemini")
+) / "newsgroups"
+
 
 def preprocess_newsgroup_row(data):
     # Extract only the subject and body
     msg = email.message_from_string(data)
     text = f"{msg['Subject']}\n\n{msg.get_payload()}"
     # Strip any remaining email addresses
-    text = re.sub(r"[\w\.-]+@[\w\.-]+", "", text)
+    text = re.sub(EMAIL_PATTERN, "", text)
     # Truncate the text to fit within the input limits
-    text = text[:40000]
+    text = text[:MAX_TEXT_CHARS]
 
     return text
 
 
-def preprocess_newsgroup_data(newsgroup_dataset):
+_email_re = re.compile(EMAIL_PATTERN)
+# Any character EMAIL_PATTERN cannot match; no match ever spans one of these.
+_email_boundary_re = re.compile(r"[^\w\.@-]")
+_header_parser = email.parser.Parser()
+
+
+def _strip_emails(text):
+    # Matches never span a newline, so only lines containing "@" need the
+    # regex; scanning every line with it is what makes the plain sub slow.
+    if "@" not in text:
+        return text
+    return "\n".join(
+        _email_re.sub("", line) if "@" in line else line for line in text.split("\n")
+    )
+
+
+def _strip_emails_and_truncate(text):
+    if len(text) > MAX_TEXT_CHARS:
+        # Only run the regex over a prefix that ends just past a boundary at or
+        # after the limit. Stripping can only shorten the text, so if the
+        # cleaned prefix still reaches the limit it equals the full result.
+        boundary = _email_boundary_re.search(text, MAX_TEXT_CHARS)
+        if boundary:
+            head = _strip_emails(text[: boundary.end()])
+            if len(head) >= MAX_TEXT_CHARS:
+                return head[:MAX_TEXT_CHARS]
+
+    return _strip_emails(text)[:MAX_TEXT_CHARS]
+
+
+def _split_headers(data):
+    # With plain "\n" line endings the headers end at the first blank line, so
+    # only that block needs to go through the parser. Anything unusual (CR line
+    # endings, a non-header line before the blank line) takes the slow path.
+    end = data.find("\n\n")
+    if end != -1 and "\r" not in data[: end + 2]:
+        msg = _header_parser.parsestr(data[: end + 2], headersonly=True)
+        if msg.get_payload() == "":
+            return msg, data[end + 2 :]
+
+    msg = _header_parser.parsestr(data, headersonly=True)
+    return msg, msg.get_payload()
+
+
+def preprocess_newsgroup_row_fast(data):
+    """Same output as preprocess_newsgroup_row, with less work per row.
+
+    Only the header block is parsed; for single-part messages the parser keeps
+    the body verbatim anyway. Multipart and message/* posts, whose payload is
+    structured, go through the reference implementation.
+    """
+    msg, body = _split_headers(data)
+    if msg.get_content_maintype() in ("multipart", "message"):
+        return preprocess_newsgroup_row(data)
+
+    return _strip_emails_and_truncate(f"{msg['Subject']}\n\n{body}")
+
+
+def _preprocess_chunk(texts):
+    return [preprocess_newsgroup_row_fast(text) for text in texts]
+
+
+def preprocess_texts(texts, workers=1, chunk_size=500):
+    """Preprocess raw posts, fanning chunks out to a process pool if workers > 1."""
+    texts = list(texts)
+    if workers <= 1 or len(texts) <= chunk_size:
+        return _preprocess_chunk(texts)
+
+    chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [text for chunk in pool.map(_preprocess_chunk, chunks) for text in chunk]
+
+
+def preprocess_newsgroup_data(newsgroup_dataset, workers=1):
     # Put data points into dataframe
     df = pd.DataFrame(
         {"Text": newsgroup_dataset.data, "Label": newsgroup_dataset.target}
     )
     # Clean up the text
-    df["Text"] = df["Text"].apply(preprocess_newsgroup_row)
+    df["Text"] = preprocess_texts(df["Text"], workers=workers)
     # Match label to target name index
     df["Class Name"] = df["Label"].map(lambda l: newsgroup_dataset.target_names[l])
 
     return df
 
-def preprocess_newsgroup_row(data):
-
-    # Extract only the subject and body
-    msg = email.message_from_string(data)
-    text = f"{msg['Subject']}\n\n{msg.get_payload()}"
-    # Strip any remaining email addresses
-    text = re.sub(r"[\w\.-]+@[\w\.-]+", "", text)
-    # Truncate the text to fit within the input limits
-    text = text[:40000]
-
-    return text
-
-def sample_data(df, num_samples, classes_to_keep):
+def sample_data(df, num_samples, classes_to_keep, seed=None):
     # Sample rows, selecting num_samples of each Label.
     df = (
         df.groupby("Label")[df.columns]
-        .apply(lambda x: x.sample(num_samples))
+        .apply(lambda x: x.sample(num_samples, random_state=seed))
         .reset_index(drop=True)
     )
 
@@ -52,20 +138,149 @@ def sample_data(df, num_samples, classes_to_keep):
     df["Class Name"] = df["Class Name"].astype("category")
 
     return df
-def load_data():
 
-    newsgroups_train = fetch_20newsgroups(subset="train")
-    newsgroups_test = fetch_20newsgroups(subset="test")
-    df_train = preprocess_newsgroup_data(newsgroups_train)
-    df_test = preprocess_newsgroup_data(newsgroups_test)
+
+def sample_indices(target, target_names, num_samples, classes_to_keep, seed=0):
+    """Pick num_samples row indices per kept label, without touching the text.
+
+    Labels whose name matches classes_to_keep are kept. Rows come out grouped
+    by label, like sample_data. The same seed gives the same indices on any
+    machine, since numpy's PCG64 stream is platform independent.
+    """
+    target = np.asarray(target)
+    rng = np.random.default_rng(seed)
+    pattern = re.compile(classes_to_keep)
+
+    selected = []
+    for label, name in enumerate(target_names):
+        if not pattern.search(name):
+            continue
+        candidates = np.flatnonzero(target == label)
+        selected.append(rng.choice(candidates, size=num_samples, replace=False))
+
+    return np.concatenate(selected) if selected else np.array([], dtype=int)
+
+
+def load_sampled(subset, num_samples, classes_to_keep, seed=0, workers=1, use_cache=True,
+                 cache_dir=DATA_CACHE_DIR):
+    """Sample a 20 Newsgroups subset first, then preprocess only the kept rows.
+
+    If load_preprocessed has already cached the subset, the kept rows are
+    read from that frame instead of being preprocessed again. Returns the
+    same columns as sample_data(load_preprocessed(subset), ...).
+    """
+    newsgroup_dataset = fetch_20newsgroups(subset=subset)
+    indices = sample_indices(
+        newsgroup_dataset.target, newsgroup_dataset.target_names, num_samples, classes_to_keep, seed=seed
+    )
+    labels = np.asarray(newsgroup_dataset.target)[indices]
+
+    path = _cache_path(cache_dir, subset)
+    if use_cache and arrow_available and path.exists():
+        texts = _open_arrow(path).column("Text").take(pa.array(indices)).to_pylist()
+    else:
+        texts = preprocess_texts([newsgroup_dataset.data[i] for i in indices], workers=workers)
+
+    df = pd.DataFrame({
+        "Text": texts,
+        "Label": labels,
+    })
+    df["Class Name"] = pd.Series(
+        [newsgroup_dataset.target_names[l] for l in labels], dtype="category"
+    )
+
+    return df
+
+
+def _preprocess_fingerprint():
+    params = f"{PREPROCESS_VERSION}|{EMAIL_PATTERN}|{MAX_TEXT_CHARS}"
+    return hashlib.sha256(params.encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_path(cache_dir, subset):
+    return Path(cache_dir) / f"{subset}-{_preprocess_fingerprint()}.arrow"
+
+
+def _write_arrow(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = path.with_suffix(".tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _open_arrow(path):
+    # Uncompressed Arrow IPC files can be memory-mapped rather than parsed;
+    # the table's buffers keep the mapping alive after the file is closed.
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _arrow_string_dtype(arrow_type):
+    # Arrow-backed pandas strings wrap the mapped buffers instead of copying
+    # every value into a Python object.
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def _read_arrow(path):
+    return _open_arrow(path).to_pandas(types_mapper=_arrow_string_dtype)
+
+
+def load_preprocessed(subset, use_cache=True, cache_dir=DATA_CACHE_DIR, workers=1):
+    """Return the preprocessed frame for a 20 Newsgroups subset.
+
+    The frame is cached as an Arrow file keyed by the preprocessing version and
+    parameters; stale cache files for the subset are removed on rebuild. A
+    cached frame's string columns are Arrow-backed (string[pyarrow]).
+    """
+    use_cache = use_cache and arrow_available
+    cache_dir = Path(cache_dir)
+    path = _cache_path(cache_dir, subset)
+
+    if use_cache and path.exists():
+        return _read_arrow(path)
+
+    df = preprocess_newsgroup_data(fetch_20newsgroups(subset=subset), workers=workers)
+
+    if use_cache:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in cache_dir.glob(f"{subset}-*.arrow"):
+            stale.unlink()
+        _write_arrow(df, path)
+
+    return df
+
+
+@timed("load_data")
+def load_data(use_cache=True, workers=1, lazy=False, seed=None):
+    """Load the sampled train/test frames.
+
+    With lazy=True, only the sampled rows are preprocessed, or read from the
+    cached frame if there is one (see load_sampled); the seed defaults to 0 in
+    that mode so samples are reproducible.
+    """
     # View list of class names for dataset
     TRAIN_NUM_SAMPLES = 50
     TEST_NUM_SAMPLES = 10
     # Keep rec.* and sci.*
     CLASSES_TO_KEEP = "^rec|^sci"
 
-    df_train = sample_data(df_train, TRAIN_NUM_SAMPLES, CLASSES_TO_KEEP)
-    df_test = sample_data(df_test, TEST_NUM_SAMPLES, CLASSES_TO_KEEP)
+    if lazy:
+        seed = 0 if seed is None else seed
+        df_train = load_sampled("train", TRAIN_NUM_SAMPLES, CLASSES_TO_KEEP, seed=seed, workers=workers,
+                                use_cache=use_cache)
+        df_test = load_sampled("test", TEST_NUM_SAMPLES, CLASSES_TO_KEEP, seed=seed, workers=workers,
+                               use_cache=use_cache)
+        return df_train, df_test
+
+    df_train = load_preprocessed("train", use_cache=use_cache, workers=workers)
+    df_test = load_preprocessed("test", use_cache=use_cache, workers=workers)
+
+    df_train = sample_data(df_train, TRAIN_NUM_SAMPLES, CLASSES_TO_KEEP, seed=seed)
+    df_test = sample_data(df_test, TEST_NUM_SAMPLES, CLASSES_TO_KEEP, seed=seed)
     return df_train, df_test
 
 
@@ -0,0 +1,244 @@
+"""
+Near-duplicate detection for the ASCII-art corpus with MinHash and LSH.
+
+Each drawing is reduced to a MinHash signature over its character shingles.
+Signatures are split into bands; two drawings become candidates when any
+band matches exactly, and candidates are kept as duplicates only if their
+estimated Jaccard similarity reaches the threshold. This avoids comparing
+every pair of the 140k records.
+"""
+
+import argparse
+import gzip
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+_MAX_HASH = np.uint32(0xFFFFFFFF)
+_SHINGLE_BASE = np.uint64(1_000_003)
+
+
+def _normalize(text):
+    # Trailing whitespace carries no drawing, leading whitespace does.
+    return "\n".join(line.rstrip() for line in text.strip("\n").splitlines())
+
+
+def shingle_hashes(text, k=5):
+    """Unique 64-bit hashes of the k-byte shingles of text."""
+    data = np.frombuffer(_normalize(text).encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+    if len(data) == 0:
+        return data
+    if len(data) < k:
+        k = len(data)
+
+    n = len(data) - k + 1
+    hashes = np.zeros(n, dtype=np.uint64)
+    for j in range(k):
+        # uint64 arithmetic wraps, which is what we want for a rolling hash.
+        hashes = hashes * _SHINGLE_BASE + data[j : j + n]
+    return np.unique(hashes)
+
+
+class MinHasher:
+    """Computes num_perm-wide MinHash signatures with multiply-shift hashing."""
+
+    def __init__(self, num_perm=128, k=5, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.k = k
+        self.seed = seed
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        hashes = shingle_hashes(text, self.k)
+        if len(hashes) == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        with np.errstate(over="ignore"):
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+def estimated_jaccard(sig_a, sig_b):
+    return float(np.mean(sig_a == sig_b))
+
+
+class LSHIndex:
+    """Banded LSH index over MinHash signatures.
+
+    Supports incremental inserts and round-trips to a directory holding the
+    parameters, keys and signature matrix; buckets are rebuilt on load.
+    include_input records whether signatures cover input_text as well, so a
+    saved index is only reused for records hashed the same way.
+    """
+
+    def __init__(self, num_perm=128, bands=16, k=5, seed=1, threshold=0.8, include_input=False):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm=num_perm, k=k, seed=seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.include_input = include_input
+        self.keys = []
+        self._signatures = []
+        self._buckets = [defaultdict(list) for _ in range(bands)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows : (i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def query(self, signature):
+        """Return (key, similarity) for indexed items at or above the threshold."""
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(band_key, ()))
+
+        matches = []
+        for idx in candidates:
+            similarity = estimated_jaccard(signature, self._signatures[idx])
+            if similarity >= self.threshold:
+                matches.append((self.keys[idx], similarity))
+        return sorted(matches, key=lambda m: -m[1])
+
+    def insert(self, key, signature):
+        idx = len(self.keys)
+        self.keys.append(key)
+        self._signatures.append(signature)
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band][band_key].append(idx)
+
+    def save(self, index_dir):
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        params = {
+            "num_perm": self.hasher.num_perm,
+            "bands": self.bands,
+            "k": self.hasher.k,
+            "seed": self.hasher.seed,
+            "threshold": self.threshold,
+            "include_input": self.include_input,
+        }
+        (index_dir / "params.json").write_text(json.dumps(params))
+        (index_dir / "keys.json").write_text(json.dumps(self.keys))
+        signatures = np.array(self._signatures, dtype=np.uint32).reshape(-1, self.hasher.num_perm)
+        np.save(index_dir / "signatures.npy", signatures)
+
+    @classmethod
+    def load(cls, index_dir, **expected):
+        """Load a saved index; raises ValueError if any expected parameter differs."""
+        index_dir = Path(index_dir)
+        params = json.loads((index_dir / "params.json").read_text())
+        mismatched = [f"{name}={params.get(name)!r} (wanted {value!r})"
+                      for name, value in expected.items() if params.get(name) != value]
+        if mismatched:
+            raise ValueError(f"Index in {index_dir} was built with {', '.join(mismatched)}")
+        index = cls(**params)
+        keys = json.loads((index_dir / "keys.json").read_text())
+        for key, signature in zip(keys, np.load(index_dir / "signatures.npy")):
+            index.insert(key, signature)
+        return index
+
+
+def _record_text(record, include_input):
+    if include_input:
+        return f"{record['input_text']}\n{record['target_text']}"
+    return record["target_text"]
+
+
+def _iter_jsonl(paths):
+    # Keys are "<absolute path>:<line number>" so they stay meaningful in a
+    # persistent index that outlives one run, and shards with the same file
+    # name in different directories do not collide.
+    for path in paths:
+        path = Path(path).resolve()
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                yield f"{path}:{line_no}", line
+
+
+def dedup_corpus(paths, out_path, report_path=None, index=None, include_input=False):
+    """Write the records of paths that are not near-duplicates of an earlier one.
+
+    Records are keyed by absolute path and line number. When index is
+    given, items already in it count as earlier records, and kept records are
+    added to it; it must have been built with the same include_input.
+    Returns run stats; the cluster report maps each kept record to the
+    records dropped as its duplicates.
+    """
+    if index is None:
+        index = LSHIndex(include_input=include_input)
+    elif index.include_input != include_input:
+        raise ValueError(f"Index was built with include_input={index.include_input}, "
+                         f"not {include_input}")
+    clusters = defaultdict(list)
+    total = kept = 0
+    start = time.perf_counter()
+
+    with open(out_path, "w", encoding="utf-8") as out:
+        for key, line in _iter_jsonl(paths):
+            total += 1
+            signature = index.hasher.signature(_record_text(json.loads(line), include_input))
+            matches = index.query(signature)
+            if matches:
+                clusters[matches[0][0]].append(key)
+                continue
+            index.insert(key, signature)
+            out.write(line)
+            kept += 1
+
+    elapsed = time.perf_counter() - start
+    if report_path:
+        report = [
+            {"representative": rep, "duplicates": dups, "size": len(dups) + 1}
+            for rep, dups in sorted(clusters.items(), key=lambda c: -len(c[1]))
+        ]
+        Path(report_path).write_text(json.dumps(report, indent=1))
+
+    return {
+        "records": total,
+        "kept": kept,
+        "dropped": total - kept,
+        "clusters": len(clusters),
+        "seconds": elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drop near-duplicate drawings from ASCII-art JSONL")
+    parser.add_argument("inputs", nargs="+", help="input_text/target_text JSONL file(s)")
+    parser.add_argument("--out", required=True, help="Where to write the reduced corpus")
+    parser.add_argument("--report", help="Where to write the cluster report (JSON)")
+    parser.add_argument("--index-dir", help="Persistent index to load from and save to")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Estimated Jaccard similarity for a duplicate")
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--bands", type=int, default=16)
+    parser.add_argument("--shingle", type=int, default=5, help="Shingle size in bytes")
+    parser.add_argument("--include-input", action="store_true", help="Also hash input_text")
+    args = parser.parse_args(argv)
+
+    if args.index_dir and (Path(args.index_dir) / "params.json").exists():
+        index = LSHIndex.load(args.index_dir, num_perm=args.num_perm, bands=args.bands, k=args.shingle,
+                              threshold=args.threshold, include_input=args.include_input)
+    else:
+        index = LSHIndex(num_perm=args.num_perm, bands=args.bands, k=args.shingle, threshold=args.threshold,
+                         include_input=args.include_input)
+
+    stats = dedup_corpus(args.inputs, args.out, args.report, index=index, include_input=args.include_input)
+    if args.index_dir:
+        index.save(args.index_dir)
+
+    print(
+        f"Kept {stats['kept']} of {stats['records']} records "
+        f"({stats['clusters']} duplicate clusters) in {stats['seconds']:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Append-only checkpoint log for evaluation runs.
+
+Every prediction is appended as one JSON line keyed by model id, a
+fingerprint of the generation config (system instruction, response schema
+and so on) and a hash of the post's text, and flushed (and fsynced) before
+the next one, so an evaluation that dies partway through keeps everything it
+finished. On restart the log is replayed and only the missing posts are
+predicted again. Keys do not depend on row labels, so a run resumes even if
+the sample comes out in a different order; predictions made in another mode
+(say free text versus --constrained) are never reused.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from tunedgemini.prediction_cache import config_fingerprint
+
+DEFAULT_CHECKPOINT_DIR = Path(
+    os.environ.get("TUNEDGEMINI_CACHE_DIR", Path.home() / ".cache" / "tunedgemini")
+) / "checkpoints"
+
+
+def _text_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class EvalCheckpoint:
+    """JSONL log of (model_id, config fingerprint, text digest) -> prediction.
+
+    config is the GenerateContentConfig (or None) the predictions are made
+    with. A torn final line, left by a crash mid-write, is dropped on open,
+    as are lines from older logs that carry no config fingerprint.
+    fsync=False trades durability across power loss for fewer disk syncs.
+    """
+
+    def __init__(self, path, fsync=True):
+        self.path = Path(path)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._done = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._replay()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _replay(self):
+        if not self.path.exists():
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+        for line in data[:end].decode("utf-8").splitlines():
+            if not line:
+                continue
+            record = json.loads(line)
+            if "config" not in record:
+                continue
+            self._done[(record["model"], record["config"], record["text"])] = record["prediction"]
+
+    @staticmethod
+    def _key(model_id, text, config):
+        return model_id, config_fingerprint(getattr(config, "system_instruction", None), config), _text_digest(text)
+
+    def get(self, model_id, text, config=None):
+        """The logged prediction for this post, or None if it has not been made."""
+        return self._done.get(self._key(model_id, text, config))
+
+    def record(self, model_id, text, prediction, config=None):
+        key = self._key(model_id, text, config)
+        line = json.dumps({"model": key[0], "config": key[1], "text": key[2], "prediction": prediction},
+                          ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._done[key] = prediction
+
+    def completed(self, model_id=None):
+        return sum(1 for key in self._done if model_id is None or key[0] == model_id)
+
+    def __len__(self):
+        return len(self._done)
+
+    def close(self):
+        self._file.close()
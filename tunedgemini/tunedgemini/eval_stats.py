@@ -0,0 +1,194 @@
+"""
+Streaming evaluation metrics and sequential stopping rules.
+
+StreamingMetrics keeps running accuracy, a confusion matrix and per-class
+precision/recall as predictions arrive. CIWidthStop halts an evaluation once
+the accuracy interval is narrow enough; PairedComparison tracks two models on
+the same rows and halts once one is significantly better, using an
+anytime-valid boundary so checking after every row does not inflate the
+false-positive rate. pairwise_tests compares any number of models scored on
+one fixed sample, with exact McNemar tests and Holm's correction.
+"""
+
+import math
+from collections import Counter
+from statistics import NormalDist
+
+import pandas as pd
+
+
+def wilson_interval(successes, n, confidence=0.95):
+    """Wilson score interval for a binomial proportion."""
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+class StreamingMetrics:
+    def __init__(self, confidence=0.95):
+        self.confidence = confidence
+        self.n = 0
+        self.correct = 0
+        self.confusion = Counter()
+
+    def update(self, truth, prediction):
+        self.n += 1
+        self.correct += truth == prediction
+        self.confusion[(truth, prediction)] += 1
+
+    @property
+    def accuracy(self):
+        return self.correct / self.n if self.n else 0.0
+
+    def interval(self):
+        return wilson_interval(self.correct, self.n, self.confidence)
+
+    def precision(self, label):
+        predicted = sum(n for (_, p), n in self.confusion.items() if p == label)
+        return self.confusion[(label, label)] / predicted if predicted else 0.0
+
+    def recall(self, label):
+        support = sum(n for (t, _), n in self.confusion.items() if t == label)
+        return self.confusion[(label, label)] / support if support else 0.0
+
+    def per_class(self):
+        labels = sorted({t for t, _ in self.confusion})
+        return pd.DataFrame({
+            "precision": [self.precision(label) for label in labels],
+            "recall": [self.recall(label) for label in labels],
+            "support": [sum(n for (t, _), n in self.confusion.items() if t == label) for label in labels],
+        }, index=labels)
+
+    def confusion_frame(self):
+        frame = pd.Series(self.confusion, dtype=int).unstack(fill_value=0) if self.confusion else pd.DataFrame()
+        frame.index.name, frame.columns.name = "truth", "prediction"
+        return frame
+
+    def summary(self):
+        low, high = self.interval()
+        return f"{self.accuracy:.2%} ({self.confidence:.0%} CI {low:.1%}-{high:.1%}, n={self.n})"
+
+
+class CIWidthStop:
+    """Stop once the accuracy interval is narrower than `width`.
+
+    The interval is checked after every row, so its coverage is approximate;
+    the width hardly depends on the running estimate, so the effect is small.
+    """
+
+    def __init__(self, width, min_samples=10):
+        self.width = width
+        self.min_samples = min_samples
+
+    def __call__(self, metrics):
+        if metrics.n < self.min_samples:
+            return False
+        low, high = metrics.interval()
+        return high - low < self.width
+
+
+class PairedComparison:
+    """Two models scored on the same rows, for sequential comparison.
+
+    Only discordant rows (one model right, the other wrong) carry evidence.
+    Their running sum is compared against a two-sided normal-mixture
+    boundary, which holds at every sample size simultaneously with
+    probability 1 - alpha.
+    """
+
+    def __init__(self, alpha=0.05, min_discordant=5, rho=10.0, confidence=0.95):
+        self.alpha = alpha
+        self.min_discordant = min_discordant
+        self.rho = rho
+        self.a = StreamingMetrics(confidence)
+        self.b = StreamingMetrics(confidence)
+        self.a_only = 0
+        self.b_only = 0
+
+    def update(self, truth, prediction_a, prediction_b):
+        self.a.update(truth, prediction_a)
+        self.b.update(truth, prediction_b)
+        a_right, b_right = truth == prediction_a, truth == prediction_b
+        self.a_only += a_right and not b_right
+        self.b_only += b_right and not a_right
+
+    def boundary(self):
+        v = self.a_only + self.b_only + self.rho
+        return math.sqrt(v * math.log(v / (self.rho * self.alpha ** 2)))
+
+    def winner(self):
+        """Return "a" or "b" once one model is significantly better, else None."""
+        if self.a_only + self.b_only < self.min_discordant:
+            return None
+        diff = self.a_only - self.b_only
+        if abs(diff) < self.boundary():
+            return None
+        return "a" if diff > 0 else "b"
+
+    def __call__(self, _=None):
+        return self.winner() is not None
+
+    def summary(self):
+        return (f"A {self.a.summary()}; B {self.b.summary()}; "
+                f"discordant A-only {self.a_only}, B-only {self.b_only}; "
+                f"winner: {self.winner() or 'undecided'}")
+
+
+def mcnemar_p_value(a_only, b_only):
+    """Exact two-sided McNemar test on the discordant counts of two models."""
+    n = a_only + b_only
+    if n == 0:
+        return 1.0
+    tail = sum(math.comb(n, k) for k in range(min(a_only, b_only) + 1))
+    return min(1.0, 2 * tail / 2 ** n)
+
+
+def holm_adjust(p_values):
+    """Holm step-down adjusted p-values, in the order given."""
+    order = sorted(range(len(p_values)), key=lambda i: p_values[i])
+    adjusted = [0.0] * len(p_values)
+    running = 0.0
+    for rank, i in enumerate(order):
+        running = max(running, min(1.0, (len(p_values) - rank) * p_values[i]))
+        adjusted[i] = running
+    return adjusted
+
+
+def pairwise_tests(truth, predictions, alpha=0.05):
+    """Compare every pair of models scored on the same rows.
+
+    predictions maps model name to its predictions, aligned with truth.
+    Returns one row per pair with both accuracies, the discordant counts,
+    the exact McNemar p-value, its Holm-adjusted value over all pairs and
+    the significantly better model (or None).
+    """
+    truth = list(truth)
+    right = {name: [t == p for t, p in zip(truth, preds)] for name, preds in predictions.items()}
+    rows = []
+    names = list(predictions)
+    for i, a in enumerate(names):
+        for b in names[i + 1:]:
+            a_only = sum(x and not y for x, y in zip(right[a], right[b]))
+            b_only = sum(y and not x for x, y in zip(right[a], right[b]))
+            rows.append({
+                "model_a": a,
+                "model_b": b,
+                "accuracy_a": sum(right[a]) / len(truth) if truth else 0.0,
+                "accuracy_b": sum(right[b]) / len(truth) if truth else 0.0,
+                "a_only": a_only,
+                "b_only": b_only,
+                "p_value": mcnemar_p_value(a_only, b_only),
+            })
+    frame = pd.DataFrame(rows, columns=["model_a", "model_b", "accuracy_a", "accuracy_b",
+                                        "a_only", "b_only", "p_value"])
+    frame["p_holm"] = holm_adjust(list(frame["p_value"]))
+    frame["winner"] = [
+        (row.model_a if row.a_only > row.b_only else row.model_b) if row.p_holm < alpha else None
+        for row in frame.itertuples()
+    ]
+    return frame
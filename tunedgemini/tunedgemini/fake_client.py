@@ -0,0 +1,366 @@
+"""
+In-process stand-in for genai.Client, for exercising the evaluation code
+without credentials or network access.
+"""
+
+import asyncio
+import datetime
+import itertools
+import random
+import re
+import threading
+import time
+
+import numpy as np
+from google import genai
+from google.genai import types
+
+from tunedgemini.token_budget import estimate_tokens
+
+_ERROR_STATUS = {400: "INVALID_ARGUMENT", 429: "RESOURCE_EXHAUSTED", 503: "UNAVAILABLE"}
+
+
+def make_response(text, finish_reason=types.FinishReason.STOP, usage=None):
+    """Build a GenerateContentResponse carrying a single text candidate."""
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                finish_reason=finish_reason,
+            )
+        ],
+        usage_metadata=usage,
+    )
+
+
+def api_error(code, message="injected by FakeClient"):
+    """The genai error a real endpoint raises for an HTTP status code."""
+    error = genai.errors.ClientError if 400 <= code < 500 else genai.errors.ServerError
+    return error(code, {"error": {"code": code, "message": message, "status": _ERROR_STATUS.get(code, "")}})
+
+
+def _resolve_latency(latency):
+    # latency may be a fixed number of seconds or a zero-arg callable
+    return latency() if callable(latency) else latency
+
+
+def lognormal_latency(median=0.5, sigma=0.5, seed=None):
+    """Latency sampler with a long right tail, like real API round-trips."""
+    rnd = random.Random(seed)
+    return lambda: rnd.lognormvariate(np.log(median), sigma)
+
+
+def _text_of(value):
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return "\n".join(_text_of(v) for v in value)
+    parts = getattr(value, "parts", None)
+    if parts is not None:
+        return "\n".join(part.text or "" for part in parts)
+    return str(value)
+
+
+class _FakeCaches:
+    """Stand-in for client.caches: remembers uploaded contexts by name.
+
+    Like the real API, contexts under min_tokens are rejected with a 400.
+    """
+
+    def __init__(self, owner, min_tokens=0):
+        self._owner = owner
+        self.min_tokens = min_tokens
+        self._ids = itertools.count()
+        self.contexts = {}
+        self.created = 0
+        self.deleted = 0
+
+    def create(self, model, config=None):
+        name = f"cachedContents/fake-{next(self._ids):04d}"
+        text = _text_of(getattr(config, "system_instruction", None)) + "\n" + _text_of(getattr(config, "contents", None))
+        tokens = estimate_tokens(text)
+        if tokens < self.min_tokens:
+            raise api_error(400, f"Cached content is too small. total_token_count={tokens}, "
+                                 f"min_total_token_count={self.min_tokens}")
+        self.contexts[name] = tokens
+        self.created += 1
+        return types.CachedContent(name=name, model=model, display_name=getattr(config, "display_name", None),
+                                   usage_metadata=types.CachedContentUsageMetadata(
+                                       total_token_count=self.contexts[name]))
+
+    def delete(self, name, config=None):
+        self.contexts.pop(name)
+        self.deleted += 1
+
+
+class _FakeModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def generate_content(self, model, contents, config=None):
+        start = self._owner._enter()
+        error = self._owner._admit()
+        usage = self._owner._usage(contents, config)
+        try:
+            if error is None:
+                time.sleep(self._owner._latency_for(usage))
+        finally:
+            self._owner._exit(start, error)
+        if error is not None:
+            raise api_error(error)
+        return make_response(self._owner.responder(model, contents, config), usage=usage)
+
+    def generate_content_stream(self, model, contents, config=None):
+        """Yield the answer chunk_chars at a time, chunk_latency apart.
+
+        Chunks are only produced as they are consumed, so closing the stream
+        early leaves the rest unsent (see FakeClient.streamed_chars).
+        """
+        owner = self._owner
+        start = owner._enter()
+        error = owner._admit()
+        try:
+            if error is not None:
+                raise api_error(error)
+            time.sleep(_resolve_latency(owner.latency))
+            text = owner.responder(model, contents, config)
+            for i in range(0, len(text), owner.chunk_chars):
+                if i:
+                    time.sleep(_resolve_latency(owner.chunk_latency))
+                piece = text[i:i + owner.chunk_chars]
+                with owner._lock:
+                    owner.streamed_chars += len(piece)
+                last = i + owner.chunk_chars >= len(text)
+                yield make_response(piece, types.FinishReason.STOP if last else None)
+        finally:
+            owner._exit(start, error)
+
+
+class _FakeAsyncModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def generate_content(self, model, contents, config=None):
+        start = self._owner._enter()
+        error = self._owner._admit()
+        usage = self._owner._usage(contents, config)
+        try:
+            if error is None:
+                await asyncio.sleep(self._owner._latency_for(usage))
+        finally:
+            self._owner._exit(start, error)
+        if error is not None:
+            raise api_error(error)
+        return make_response(self._owner.responder(model, contents, config), usage=usage)
+
+
+class _FakeAio:
+    def __init__(self, owner):
+        self.models = _FakeAsyncModels(owner)
+
+
+class FakeClock:
+    """Manually advanced clock; sleeping moves time forward instantly."""
+
+    def __init__(self, start=None):
+        self._now = start or datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+    def now(self):
+        return self._now
+
+    def advance(self, seconds):
+        self._now += datetime.timedelta(seconds=seconds)
+
+    async def sleep(self, seconds):
+        self.advance(max(seconds, 0))
+        # Still yield so other tasks get to run.
+        await asyncio.sleep(0)
+
+
+class SimulatedTunings:
+    """Stand-in for client.tunings whose jobs advance on a clock.
+
+    Each job waits queue_seconds in JOB_STATE_PENDING, trains for
+    train_seconds in JOB_STATE_RUNNING and then ends in final_state.
+    `durations(config)` may return (queue_seconds, train_seconds) per job.
+    """
+
+    def __init__(self, clock=None, queue_seconds=120, train_seconds=600, durations=None,
+                 final_state=types.JobState.JOB_STATE_SUCCEEDED):
+        self.clock = clock or FakeClock()
+        self.durations = durations or (lambda config: (queue_seconds, train_seconds))
+        self.final_state = final_state
+        self.get_calls = 0
+        self.list_calls = 0
+        self._jobs = {}
+        self._ids = itertools.count()
+
+    def tune(self, base_model, training_dataset, config=None):
+        display_name = getattr(config, "tuned_model_display_name", None) or "tuned model"
+        slug = re.sub(r"[^a-z0-9]+", "-", display_name.lower()).strip("-")
+        name = f"tunedModels/{slug}-{next(self._ids):04d}"
+        queue_seconds, train_seconds = self.durations(config)
+        self._jobs[name] = {
+            "base_model": base_model,
+            "config": config,
+            "training_dataset": training_dataset,
+            "created": self.clock.now(),
+            "queue": datetime.timedelta(seconds=queue_seconds),
+            "train": datetime.timedelta(seconds=train_seconds),
+        }
+        return self._snapshot(name)
+
+    def _snapshot(self, name):
+        job = self._jobs[name]
+        now = self.clock.now()
+        started = job["created"] + job["queue"]
+        ended = started + job["train"]
+        if now < started:
+            state, start_time, end_time = types.JobState.JOB_STATE_PENDING, None, None
+        elif now < ended:
+            state, start_time, end_time = types.JobState.JOB_STATE_RUNNING, started, None
+        else:
+            state, start_time, end_time = self.final_state, started, ended
+        return types.TuningJob(
+            name=name,
+            state=state,
+            base_model=job["base_model"],
+            create_time=job["created"],
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+    def get(self, name, config=None):
+        self.get_calls += 1
+        return self._snapshot(name)
+
+    def list(self, config=None):
+        self.list_calls += 1
+        return [self._snapshot(name) for name in self._jobs]
+
+
+def tuned_model_responder(tunings, answers, accuracy, seed=0):
+    """Responder for models tuned on a SimulatedTunings backend.
+
+    answers maps a post to its true label; a model answers correctly with
+    probability accuracy(config), config being its job's CreateTuningJobConfig,
+    and otherwise with another label. Answers are deterministic per model and post.
+    """
+    labels = sorted(set(answers.values()))
+    quality = {}
+
+    def respond(model, contents, config):
+        if model not in quality:
+            quality[model] = accuracy(tunings._jobs[model]["config"])
+        truth = answers[contents]
+        rnd = random.Random(f"{seed}|{model}|{contents}")
+        if rnd.random() < quality[model]:
+            return truth
+        return rnd.choice([label for label in labels if label != truth] or labels)
+
+    return respond
+
+
+class FakeClient:
+    """Mimics the parts of genai.Client used by predict_eval and fine_tune.
+
+    `responder(model, contents, config)` returns the text the model answers with,
+    `latency` is seconds per call (or a callable returning seconds). `tunings`
+    is typically a SimulatedTunings.
+
+    error_rates maps a status code (429, 503) to the probability a call fails
+    with it. rate_limit caps calls per second (with `burst` calls of slack);
+    calls over the limit fail with 429. Every call is logged in `log` as
+    (seconds, status).
+
+    Streaming calls wait `latency` before the first chunk and `chunk_latency`
+    between chunks of chunk_chars characters; streamed_chars counts the
+    characters actually sent.
+
+    Responses carry usage_metadata with locally estimated prompt tokens.
+    `caches` holds contexts uploaded with caches.create; tokens served from
+    one are reported as cached_content_token_count. seconds_per_token adds
+    latency for each input token not served from a cache, and contexts under
+    min_cache_tokens are refused like the real API refuses them.
+    """
+
+    def __init__(self, responder=None, latency=0.0, tunings=None, error_rates=None,
+                 rate_limit=None, burst=1, seed=None, chunk_chars=16, chunk_latency=0.0,
+                 seconds_per_token=0.0, min_cache_tokens=0):
+        self.responder = responder or (lambda model, contents, config: "")
+        self.latency = latency
+        self.tunings = tunings or SimulatedTunings()
+        self.error_rates = error_rates or {}
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.log = []
+        self._random = random.Random(seed)
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chunk_chars = chunk_chars
+        self.chunk_latency = chunk_latency
+        self.streamed_chars = 0
+        self.seconds_per_token = seconds_per_token
+        self._lock = threading.Lock()
+        self.models = _FakeModels(self)
+        self.aio = _FakeAio(self)
+        self.caches = _FakeCaches(self, min_cache_tokens)
+
+    def _usage(self, contents, config):
+        cached = self.caches.contexts.get(getattr(config, "cached_content", None), 0)
+        prompt = estimate_tokens(_text_of(contents)) + estimate_tokens(_text_of(getattr(config, "system_instruction", None)))
+        return types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt + cached, cached_content_token_count=cached or None)
+
+    def _latency_for(self, usage):
+        uncached = usage.prompt_token_count - (usage.cached_content_token_count or 0)
+        return _resolve_latency(self.latency) + self.seconds_per_token * uncached
+
+    def _enter(self):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return time.perf_counter()
+
+    def _admit(self):
+        """Return the status code to fail this call with, or None to serve it."""
+        with self._lock:
+            if self.rate_limit is not None:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate_limit)
+                self._refilled = now
+                if self._tokens < 1:
+                    return 429
+                self._tokens -= 1
+            for code, rate in self.error_rates.items():
+                if self._random.random() < rate:
+                    return code
+        return None
+
+    def _exit(self, start, error=None):
+        with self._lock:
+            self.in_flight -= 1
+            self.log.append((time.perf_counter() - start, error or 200))
+
+    def stats(self):
+        """Call counts by status and latency percentiles of served calls."""
+        with self._lock:
+            log = list(self.log)
+        served = np.array([seconds for seconds, status in log if status == 200])
+        by_status = {}
+        for _, status in log:
+            by_status[status] = by_status.get(status, 0) + 1
+        percentiles = np.percentile(served, [50, 95, 99]) if len(served) else [0.0, 0.0, 0.0]
+        return {
+            "calls": len(log),
+            "by_status": by_status,
+            "p50": float(percentiles[0]),
+            "p95": float(percentiles[1]),
+            "p99": float(percentiles[2]),
+        }
@@ -0,0 +1,167 @@
+"""
+Few-shot prompting for base-model classification, with the examples held in
+a context cache.
+
+select_examples picks the k training posts per class closest to their class
+centroid in TF-IDF space, adding the next closest ones, class by class, until
+the examples reach min_tokens. FewShotContext uploads those examples plus the
+system instruction once with client.caches.create, so each request carries
+only the post and a reference to the cache. A context cache has a minimum
+size per model (min_cache_tokens); a smaller set of examples is rejected
+with a ValueError. With use_cache=False, or if the API still refuses the
+cache as invalid, the examples are inlined into every request instead and
+the reason is kept in `stats["fallback"]`.
+"""
+
+import hashlib
+import json
+import time
+
+import numpy as np
+from google import genai
+from google.genai import types
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from tunedgemini.token_budget import estimate_tokens, truncate_to_tokens
+
+
+# Smallest context, in tokens, that caches.create accepts per model family.
+MIN_CACHE_TOKENS = {
+    "gemini-1.5-flash": 32768,
+    "gemini-1.5-pro": 32768,
+}
+DEFAULT_MIN_CACHE_TOKENS = 4096
+
+# estimate_tokens is approximate; aim this much above the minimum.
+_CACHE_MARGIN = 1.1
+
+
+def min_cache_tokens(model_id):
+    name = model_id.rsplit("/", 1)[-1]
+    for prefix, tokens in MIN_CACHE_TOKENS.items():
+        if name.startswith(prefix):
+            return tokens
+    return DEFAULT_MIN_CACHE_TOKENS
+
+
+def select_examples(df_train, k=2, max_tokens=400, min_tokens=0):
+    """At least k representative posts per class, each truncated to max_tokens.
+
+    While the examples come to fewer than min_tokens (estimated), the next
+    most central post of each class is added in turn, until df_train runs out.
+    """
+    vectors = TfidfVectorizer(sublinear_tf=True, min_df=2).fit_transform(df_train["Text"])
+    labels = df_train["Class Name"].astype(str).to_numpy()
+    ranked = []
+    for label in sorted(set(labels)):
+        rows = np.flatnonzero(labels == label)
+        centroid = np.asarray(vectors[rows].mean(axis=0)).ravel()
+        scores = vectors[rows] @ centroid
+        ranked.append(list(rows[np.argsort(-scores, kind="stable")]))
+
+    texts = df_train["Text"].tolist()
+    tokens = {}
+
+    def cost(row):
+        if row not in tokens:
+            tokens[row] = estimate_tokens(truncate_to_tokens(texts[row], max_tokens))
+        return tokens[row]
+
+    chosen = [row for rows in ranked for row in rows[:k]]
+    total = sum(cost(row) for row in chosen)
+    depth = k
+    while total < min_tokens * _CACHE_MARGIN and any(len(rows) > depth for rows in ranked):
+        for rows in ranked:
+            if len(rows) > depth:
+                chosen.append(rows[depth])
+                total += cost(rows[depth])
+        depth += 1
+
+    examples = df_train.iloc[sorted(chosen)][["Text", "Class Name"]].copy()
+    examples["Text"] = [truncate_to_tokens(text, max_tokens) for text in examples["Text"]]
+    return examples
+
+
+def examples_block(examples):
+    parts = [f"Post:\n{text}\nNewsgroup: {label}" for text, label in zip(examples["Text"], examples["Class Name"])]
+    return "Here are example posts with the newsgroup each came from.\n\n" + "\n\n".join(parts)
+
+
+class FewShotContext:
+    """The shared part of every few-shot request, built once.
+
+    `config` and `fingerprint` are fixed for the lifetime of the context;
+    contents(post) is what each request sends. `stats` tracks per-request
+    latency and input tokens, whether the cache is in use and, if the API
+    refused it, why.
+    """
+
+    def __init__(self, client, model_id, examples, system_instruction, use_cache=True, ttl="3600s"):
+        self.client = client
+        self.model_id = model_id
+        self.block = examples_block(examples)
+        self.system_instruction = system_instruction
+        self.fingerprint = hashlib.sha256(
+            json.dumps([system_instruction, self.block]).encode("utf-8")).hexdigest()
+        self.context_tokens = estimate_tokens(system_instruction) + estimate_tokens(self.block)
+        self.cache_name = None
+        fallback = None if use_cache else "use_cache=False"
+        if use_cache:
+            minimum = min_cache_tokens(model_id)
+            if self.context_tokens < minimum:
+                raise ValueError(
+                    f"Few-shot examples come to ~{self.context_tokens} tokens, below the {minimum}-token "
+                    f"minimum for a context cache on {model_id}; select more examples "
+                    f"(select_examples(min_tokens=...)) or pass use_cache=False")
+            try:
+                cached = client.caches.create(model=model_id, config=types.CreateCachedContentConfig(
+                    contents=[types.Content(role="user", parts=[types.Part(text=self.block)])],
+                    system_instruction=system_instruction,
+                    display_name=f"few-shot-{self.fingerprint[:12]}",
+                    ttl=ttl,
+                ))
+                self.cache_name = cached.name
+            except genai.errors.ClientError as e:
+                # 400 is how the API rejects a context it will not cache, e.g. one
+                # still under the minimum by its own count; anything else is a real error.
+                if e.code != 400:
+                    raise
+                fallback = f"cache rejected: {e.message or e}"
+
+        if self.cache_name:
+            self.config = types.GenerateContentConfig(cached_content=self.cache_name)
+            self._shared_tokens = 0
+        else:
+            self.config = types.GenerateContentConfig(system_instruction=system_instruction)
+            self._shared_tokens = self.context_tokens
+        self.stats = {"cached": self.cache_name is not None, "fallback": fallback,
+                      "context_tokens": self.context_tokens, "requests": 0, "seconds": 0.0, "input_tokens": 0}
+
+    @property
+    def cached(self):
+        return self.cache_name is not None
+
+    def contents(self, post):
+        if self.cached:
+            return post
+        return f"{self.block}\n\nPost:\n{post}\nNewsgroup:"
+
+    def record(self, start, post, response):
+        """Account for one request: wall time and the input tokens it was billed for."""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None and usage.prompt_token_count:
+            tokens = usage.prompt_token_count - (usage.cached_content_token_count or 0)
+        else:
+            tokens = self._shared_tokens + estimate_tokens(post)
+        self.stats["requests"] += 1
+        self.stats["seconds"] += time.perf_counter() - start
+        self.stats["input_tokens"] += tokens
+
+    def per_request(self):
+        n = max(self.stats["requests"], 1)
+        return {"seconds": self.stats["seconds"] / n, "input_tokens": self.stats["input_tokens"] / n}
+
+    def close(self):
+        if self.cache_name:
+            self.client.caches.delete(name=self.cache_name)
+            self.cache_name = None
@@ -1,22 +1,59 @@
 from collections.abc import Iterable
+import asyncio
 import random
 from google.genai import types
 import datetime
-import time
 
-def fine_tune(client,  df_train, base_model="models/gemini-1.5-flash-001-tuning", model_id=None):
-    # Convert the data frame into a dataset suitable for tuning.
-    input_data = {'examples': 
-        df_train[['Text', 'Class Name']]
-        .rename(columns={'Text': 'textInput', 'Class Name': 'output'})
-        .to_dict(orient='records')
-    }
+from tunedgemini.token_budget import print_token_report
+from tunedgemini.tuning_monitor import TuningMonitor
+from tunedgemini.model_registry import FAILED_STATES, dataset_fingerprint
+from tunedgemini.metrics import timed
+
+TUNING_CONFIG = {
+    "tuned_model_display_name": "Newsgroup classification model",
+    "batch_size": 16,
+    "epoch_count": 2,
+}
+
+def tuning_examples(df_train):
+    # Convert the data frame into a dataset suitable for tuning, straight from
+    # the columns rather than through a renamed copy of the frame.
+    return [
+        {'textInput': text, 'output': label}
+        for text, label in zip(df_train['Text'], df_train['Class Name'])
+    ]
+
+def start_tuning(client, examples, base_model, config):
+    """Queue a tuning job on examples with the given CreateTuningJobConfig fields."""
+    return client.tunings.tune(
+        base_model=f"models/{base_model}-tuning",
+        training_dataset={'examples': examples},
+        config=types.CreateTuningJobConfig(**config),
+    )
+
+@timed("fine_tune")
+def fine_tune(client,  df_train, base_model="models/gemini-1.5-flash-001-tuning", model_id=None, registry=None,
+              hyperparameters=None):
+    # hyperparameters override entries of TUNING_CONFIG, e.g. {"epoch_count": 4}.
+    config = {**TUNING_CONFIG, **(hyperparameters or {})}
+    input_data = {'examples': tuning_examples(df_train)}
 
     # If you are re-running this lab, add your model_id here.
 
-    # Or try and find a recent tuning job.
+    # A model tuned on exactly this data and config can be reused directly.
+    fingerprint = None
+    if not model_id and registry is not None:
+        fingerprint = dataset_fingerprint(input_data['examples'], base_model, config)
+        found = registry.lookup(fingerprint)
+        if found and found[1] not in FAILED_STATES:
+            model_id = found[0]
+            print(f'Found {model_id} ({found[1]}) for this training data in the registry.')
+
+    # Or try and find a recent tuning job. This also runs on a registry miss,
+    # since jobs started before the registry existed are not in it.
     if not model_id:
         queued_model = None
+        found_state = None
     # Newest models first.
         for m in reversed(client.tunings.list()):
             # Only look at newsgroup classification models.
@@ -24,6 +61,7 @@ def fine_tune(client,  df_train, base_model="models/gemini-1.5-flash-001-tuning"
             # If there is a completed model, use the first (newest) one.
                 if m.state.name == 'JOB_STATE_SUCCEEDED':
                     model_id = m.name
+                    found_state = m.state.name
                     print('Found existing tuned model to reuse.')
                     break
 
@@ -33,42 +71,53 @@ def fine_tune(client,  df_train, base_model="models/gemini-1.5-flash-001-tuning"
         else:
             if queued_model:
                 model_id = queued_model
+                found_state = 'JOB_STATE_RUNNING'
             print('Found queued model, still waiting.')
 
+        # Record what the scan found, so the next run hits the registry.
+        if model_id and registry is not None:
+            registry.register(fingerprint, model_id, found_state, base_model, config)
 
-        # Upload the training data and queue the tuning job.
-        if not model_id:
-            tuning_op = client.tunings.tune(
-                base_model=f"models/{base_model}-tuning",
-                training_dataset=input_data,
-                config=types.CreateTuningJobConfig(
-                    tuned_model_display_name="Newsgroup classification model",
-                    batch_size=16,
-                    epoch_count=2,
-                ),
-            )
 
-            print(tuning_op.state)
-            model_id = tuning_op.name
-
-    return model_id
-
-def get_tuned_model(client, model_id):
-    MAX_WAIT = datetime.timedelta(minutes=10)
+    # Upload the training data and queue the tuning job.
+    if not model_id:
+        print_token_report([e['textInput'] for e in input_data['examples']], "Tuning data")
+        tuning_op = start_tuning(client, input_data['examples'], base_model, config)
 
-    while not (tuned_model := client.tunings.get(name=model_id)).has_ended:
+        print(tuning_op.state)
+        model_id = tuning_op.name
+        if registry is not None:
+            registry.register(fingerprint, model_id, tuning_op.state.name, base_model, config)
 
-        print(tuned_model.state)
-        time.sleep(60)
+    return model_id
 
+@timed("get_tuned_model")
+def get_tuned_model(client, model_id, max_wait=datetime.timedelta(minutes=10),
+                    fallback_model_id="tunedModels/newsgroup-classification-model-ltenbi1b", clock=None,
+                    registry=None):
+    monitor = TuningMonitor(client, clock=clock)
+
+    async def wait():
+        tuned = monitor.watch(model_id, max_wait=max_wait,
+                              on_done=lambda record: print(f"{record.name}: {record.state}"))
+        await monitor.run()
+        return tuned.result()
+
+    try:
+        tuned_model = asyncio.run(wait())
+        if registry is not None:
+            registry.update_state(model_id, tuned_model.state.name)
+    except TimeoutError:
         # Don't wait too long. Use a public model if this is going to take a while.
-        if datetime.datetime.now(datetime.timezone.utc) - tuned_model.create_time > MAX_WAIT:
-            print("Taking a shortcut, using a previously prepared model.")
-            model_id = "tunedModels/newsgroup-classification-model-ltenbi1b"
-            tuned_model = client.tunings.get(name=model_id)
-            break
-
-
+        if not fallback_model_id:
+            raise
+        print(f"Taking a shortcut, using a previously prepared model ({fallback_model_id}).")
+        tuned_model = client.tunings.get(name=fallback_model_id)
+
+    record = monitor.records[model_id]
+    queued, trained = record.queue_seconds(), record.training_seconds()
+    print(f"Time in queue: {'n/a' if queued is None else f'{queued:.0f}s'}, "
+          f"time training: {'n/a' if trained is None else f'{trained:.0f}s'}")
     print(f"Done! The model state is: {tuned_model.state.name}")
 
     if not tuned_model.has_succeeded and tuned_model.error:
@@ -0,0 +1,187 @@
+"""
+Random access into large JSONL files without loading them.
+
+JsonlStore memory-maps the file and keeps a sidecar index of line offsets
+(`<file>.idx.npy`, built once with a vectorized newline scan and itself
+memory-mapped), so record i is one slice and one json.loads. Sampling,
+train/test splits and chunked iteration work on index arrays, so peak memory
+does not grow with the corpus. VertexJsonlWriter streams records out in the
+Vertex `model_input`/`model_output` tuning format.
+"""
+
+import json
+import mmap
+import os
+from pathlib import Path
+
+import numpy as np
+
+_SCAN_BYTES = 64 * 2**20
+
+
+def index_path(path):
+    return Path(f"{path}.idx.npy")
+
+
+def build_index(path):
+    """Write and return the (n, 2) int64 array of [start, end) offsets of non-blank lines."""
+    path = Path(path)
+    size = path.stat().st_size
+    offsets = np.empty((0, 2), dtype=np.int64)
+    if size:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            buf = np.frombuffer(mm, dtype=np.uint8)
+            # Scan in slices so the comparison never allocates a file-sized mask.
+            ends = np.concatenate([
+                np.flatnonzero(buf[pos:pos + _SCAN_BYTES] == ord("\n")) + pos
+                for pos in range(0, size, _SCAN_BYTES)
+            ]).astype(np.int64)
+            if not len(ends) or ends[-1] != size - 1:
+                ends = np.append(ends, size)
+            starts = np.concatenate(([0], ends[:-1] + 1))
+            # Don't count the \r of CRLF line endings, then drop blank lines.
+            crlf = (ends > starts) & (buf[np.maximum(ends - 1, 0)] == ord("\r"))
+            ends = ends - crlf
+            offsets = np.stack([starts, ends], axis=1)[ends > starts]
+            # Lines starting with whitespace are rare; check those for being blank.
+            suspect = np.flatnonzero(np.isin(buf[offsets[:, 0]], np.frombuffer(b" \t\r", dtype=np.uint8)))
+            blank = [i for i in suspect if not mm[offsets[i, 0]:offsets[i, 1]].strip()]
+            offsets = np.delete(offsets, blank, axis=0)
+            del buf
+    np.save(index_path(path), offsets)
+    return offsets
+
+
+def _load_index(path):
+    idx = index_path(path)
+    if idx.exists() and idx.stat().st_mtime_ns >= Path(path).stat().st_mtime_ns:
+        offsets = np.load(idx, mmap_mode="r")
+        if offsets.ndim == 2 and (len(offsets) == 0 or offsets[-1, 1] <= Path(path).stat().st_size):
+            return offsets
+    build_index(path)
+    return np.load(idx, mmap_mode="r")
+
+
+class JsonlStore:
+    """Indexed, memory-mapped view of a JSONL file.
+
+    store[i] parses record i; store.sample(), store.split() and store.subset()
+    return JsonlViews over chosen rows, which read records only on access.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.offsets = _load_index(self.path)
+        self._file = open(self.path, "rb")
+        size = self.path.stat().st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def raw(self, i):
+        start, end = self.offsets[i]
+        return self._mm[start:end]
+
+    def __getitem__(self, i):
+        return json.loads(self.raw(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def subset(self, indices):
+        return JsonlView(self, np.asarray(indices, dtype=np.int64))
+
+    def sample(self, n, seed=0):
+        """n distinct records chosen uniformly with a seeded PCG64 generator."""
+        rng = np.random.default_rng(seed)
+        return self.subset(np.sort(rng.choice(len(self), size=min(n, len(self)), replace=False)))
+
+    def split(self, test_fraction=0.1, seed=0):
+        """Seeded (train, test) views; every record lands in exactly one."""
+        order = np.random.default_rng(seed).permutation(len(self))
+        n_test = int(round(len(self) * test_fraction))
+        return self.subset(np.sort(order[n_test:])), self.subset(np.sort(order[:n_test]))
+
+    def chunks(self, size=1000):
+        return self.subset(np.arange(len(self))).chunks(size)
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonlView:
+    """A selection of rows of a JsonlStore."""
+
+    def __init__(self, store, indices):
+        self.store = store
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, i):
+        return self.store[self.indices[i]]
+
+    def __iter__(self):
+        for i in self.indices:
+            yield self.store[i]
+
+    def chunks(self, size=1000):
+        """Yield lists of at most `size` parsed records."""
+        for pos in range(0, len(self.indices), size):
+            yield [self.store[i] for i in self.indices[pos:pos + size]]
+
+
+class VertexJsonlWriter:
+    """Streaming writer for Vertex tuning files, one record per line.
+
+    Each record is {"model_input": {"context": ..., "examples": []},
+    "model_output": {"content": ...}}; context_template is formatted with
+    the input text. Writes go to a temporary file renamed into place on close.
+    """
+
+    def __init__(self, path, context_template="{}"):
+        self.path = Path(path)
+        self.context_template = context_template
+        self.count = 0
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._tmp, "w", encoding="utf-8")
+
+    def write(self, input_text, output_text):
+        record = {
+            "model_input": {"context": self.context_template.format(input_text), "examples": []},
+            "model_output": {"content": output_text},
+        }
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def write_records(self, records, input_key, output_key):
+        for record in records:
+            self.write(record[input_key], record[output_key])
+        return self.count
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            os.replace(self._tmp, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self._file.close()
+            self._tmp.unlink(missing_ok=True)
+        else:
+            self.close()
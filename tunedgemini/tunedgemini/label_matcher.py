@@ -0,0 +1,73 @@
+"""
+Map near-miss model outputs back onto a fixed set of class labels.
+
+Exact matches are tried first, then matches after normalising case,
+punctuation and whitespace, then a unique label contained in the output (or
+an output that is a unique dotted suffix or prefix of a label, like "autos"
+for rec.autos), and finally a close fuzzy match. Results are memoised, since
+models repeat the same few near-misses.
+"""
+
+import difflib
+import re
+
+_strip_re = re.compile(r"^[\s\"'`*.:\-]+|[\s\"'`*.:\-]+$")
+_space_re = re.compile(r"\s+")
+_prefix_re = re.compile(r"^(newsgroup|label|category|answer|class)\s*[:=]\s*", re.IGNORECASE)
+
+
+def normalize_label(text):
+    text = _prefix_re.sub("", text.strip())
+    text = _strip_re.sub("", text).lower()
+    return _space_re.sub("", text)
+
+
+class LabelMatcher:
+    def __init__(self, labels, cutoff=0.85):
+        self.labels = list(labels)
+        self.cutoff = cutoff
+        self._exact = set(self.labels)
+        self._normalized = {normalize_label(label): label for label in self.labels}
+        self._suffixes = {}
+        for label in self.labels:
+            parts = normalize_label(label).split(".")
+            for i in range(1, len(parts)):
+                self._suffixes.setdefault(".".join(parts[i:]), set()).add(label)
+        self._memo = {}
+        self.corrections = 0
+
+    def match(self, text):
+        """The label `text` most plausibly means, or None if none is close."""
+        if text in self._exact:
+            return text
+        if text not in self._memo:
+            self._memo[text] = self._match(text)
+        if self._memo[text] is not None:
+            self.corrections += 1
+        return self._memo[text]
+
+    def _match(self, text):
+        key = normalize_label(text)
+        if not key:
+            return None
+        if key in self._normalized:
+            return self._normalized[key]
+
+        contained = [label for norm, label in self._normalized.items() if norm in key]
+        if contained:
+            # Prefer the most specific label, e.g. rec.sport.hockey over rec.sport.
+            longest = max(contained, key=len)
+            if sum(len(label) == len(longest) for label in contained) == 1:
+                return longest
+
+        suffix_labels = self._suffixes.get(key, ())
+        if len(suffix_labels) == 1:
+            return next(iter(suffix_labels))
+
+        # "misc" is a suffix of several labels and a prefix of one; that is ambiguous.
+        prefixed = [label for norm, label in self._normalized.items() if norm.startswith(key + ".")]
+        if len(prefixed) == 1 and not suffix_labels:
+            return prefixed[0]
+
+        close = difflib.get_close_matches(key, list(self._normalized), n=1, cutoff=self.cutoff)
+        return self._normalized[close[0]] if close else None
@@ -0,0 +1,205 @@
+"""
+Lightweight instrumentation for the eval and tuning pipeline.
+
+Records per-stage spans, a per-request latency histogram, retries by status
+code, token counts and simple event counters, and exports them as JSON or
+Prometheus text. Everything is off unless TUNEDGEMINI_METRICS=1 is set or
+METRICS.enable() is called; when off, each hook is a single flag check.
+"""
+
+import contextlib
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _le(bound):
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+class _Histogram:
+    def __init__(self, buckets=REQUEST_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+
+
+class Metrics:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.requests = {}
+            self.retries = {}
+            self.tokens = {"sent": 0, "received": 0}
+            self.events = {}
+
+    # Stage spans
+
+    @contextlib.contextmanager
+    def _span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stage = self.stages.setdefault(name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+                stage["count"] += 1
+                stage["seconds"] += elapsed
+                stage["max_seconds"] = max(stage["max_seconds"], elapsed)
+
+    def span(self, name):
+        """Context manager timing one run of a pipeline stage."""
+        return self._span(name) if self.enabled else _NULL_SPAN
+
+    # Requests
+
+    def request_start(self):
+        """Start time for record_request, or None while disabled."""
+        return time.perf_counter() if self.enabled else None
+
+    def record_request(self, model_id, start, response=None):
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        usage = getattr(response, "usage_metadata", None)
+        with self._lock:
+            self.requests.setdefault(model_id, _Histogram()).observe(elapsed)
+            if usage is not None:
+                self.tokens["sent"] += usage.prompt_token_count or 0
+                self.tokens["received"] += usage.candidates_token_count or 0
+
+    def record_retry(self, exc):
+        """on_error hook for google.api_core Retry objects."""
+        if not self.enabled:
+            return
+        code = str(getattr(exc, "code", None) or type(exc).__name__)
+        with self._lock:
+            self.retries[code] = self.retries.get(code, 0) + 1
+
+    def count(self, event, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.events[event] = self.events.get(event, 0) + n
+
+    # Export
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "stages": {name: dict(stage) for name, stage in self.stages.items()},
+                "requests": {
+                    model_id: {
+                        "count": hist.count,
+                        "seconds": hist.sum,
+                        "buckets": {_le(bound): n for bound, n in hist.cumulative()},
+                    }
+                    for model_id, hist in self.requests.items()
+                },
+                "retries": dict(self.retries),
+                "tokens": dict(self.tokens),
+                "events": dict(self.events),
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self):
+        data = self.to_dict()
+        lines = [
+            "# HELP tunedgemini_stage_seconds Time spent in pipeline stages.",
+            "# TYPE tunedgemini_stage_seconds summary",
+        ]
+        for name, stage in data["stages"].items():
+            lines.append(f'tunedgemini_stage_seconds_sum{{stage="{_escape(name)}"}} {stage["seconds"]}')
+            lines.append(f'tunedgemini_stage_seconds_count{{stage="{_escape(name)}"}} {stage["count"]}')
+
+        lines += [
+            "# HELP tunedgemini_request_seconds Latency of generate_content calls.",
+            "# TYPE tunedgemini_request_seconds histogram",
+        ]
+        for model_id, hist in data["requests"].items():
+            model = _escape(model_id)
+            for le, n in hist["buckets"].items():
+                lines.append(f'tunedgemini_request_seconds_bucket{{model="{model}",le="{le}"}} {n}')
+            lines.append(f'tunedgemini_request_seconds_sum{{model="{model}"}} {hist["seconds"]}')
+            lines.append(f'tunedgemini_request_seconds_count{{model="{model}"}} {hist["count"]}')
+
+        lines += [
+            "# HELP tunedgemini_retries_total Retried API errors by status code.",
+            "# TYPE tunedgemini_retries_total counter",
+        ]
+        lines += [f'tunedgemini_retries_total{{code="{_escape(c)}"}} {n}' for c, n in data["retries"].items()]
+
+        lines += [
+            "# HELP tunedgemini_tokens_total Tokens sent to and received from the model.",
+            "# TYPE tunedgemini_tokens_total counter",
+        ]
+        lines += [f'tunedgemini_tokens_total{{direction="{d}"}} {n}' for d, n in data["tokens"].items()]
+
+        lines += [
+            "# HELP tunedgemini_events_total Pipeline event counters.",
+            "# TYPE tunedgemini_events_total counter",
+        ]
+        lines += [f'tunedgemini_events_total{{event="{_escape(e)}"}} {n}' for e, n in data["events"].items()]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write metrics to path; a .prom suffix selects Prometheus text format."""
+        text = self.to_prometheus() if str(path).endswith(".prom") else self.to_json()
+        with open(path, "w") as f:
+            f.write(text)
+
+
+METRICS = Metrics(enabled=os.environ.get("TUNEDGEMINI_METRICS") == "1")
+
+
+def timed(name):
+    """Decorator recording each call of a function as a span of `name`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return fn(*args, **kwargs)
+            with METRICS.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,97 @@
+"""
+Local registry of tuned models, keyed by a fingerprint of the tuning data.
+
+fine_tune consults it before listing tuning jobs, so a rerun with unchanged
+training data, base model and hyperparameters resolves its model directly
+and never queues a duplicate job.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_REGISTRY_PATH = Path(
+    os.environ.get("TUNEDGEMINI_CACHE_DIR", Path.home() / ".cache" / "tunedgemini")
+) / "models.sqlite"
+
+# A registered job in one of these states will not produce a model.
+FAILED_STATES = {"JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_CANCELLING", "JOB_STATE_EXPIRED"}
+
+
+def dataset_fingerprint(examples, base_model, hyperparameters=None):
+    """Content hash of tuning examples plus the settings that shape the model."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([base_model, hyperparameters or {}], sort_keys=True).encode("utf-8"))
+    for example in examples:
+        digest.update(b"\n")
+        digest.update(json.dumps(example, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """SQLite store mapping dataset fingerprints to tuned model ids and states."""
+
+    def __init__(self, path=DEFAULT_REGISTRY_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS models ("
+            " fingerprint TEXT PRIMARY KEY,"
+            " model_id TEXT,"
+            " state TEXT,"
+            " base_model TEXT,"
+            " hyperparameters TEXT,"
+            " created REAL,"
+            " updated REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS models_model_id ON models(model_id)")
+
+    def lookup(self, fingerprint):
+        """Return (model_id, state) for fingerprint, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT model_id, state FROM models WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def register(self, fingerprint, model_id, state, base_model=None, hyperparameters=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO models"
+                " (fingerprint, model_id, state, base_model, hyperparameters, created, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (fingerprint, model_id, state, base_model, json.dumps(hyperparameters or {}), now, now),
+            )
+
+    def update_state(self, model_id, state):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE models SET state = ?, updated = ? WHERE model_id = ?",
+                (state, time.time(), model_id),
+            )
+
+    def entries(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT fingerprint, model_id, state, base_model, hyperparameters FROM models ORDER BY updated DESC"
+            ).fetchall()
+        return [
+            {
+                "fingerprint": fingerprint,
+                "model_id": model_id,
+                "state": state,
+                "base_model": base_model,
+                "hyperparameters": json.loads(hyperparameters),
+            }
+            for fingerprint, model_id, state, base_model, hyperparameters in rows
+        ]
+
+    def close(self):
+        self._conn.close()
@@ -1,9 +1,23 @@
 from tqdm.rich import tqdm as tqdmr
 import tqdm
+import asyncio
+import functools
+import json
+import time
 import warnings
+import numpy as np
+import pandas as pd
 from google.api_core import retry
 
 from tunedgemini.data_loader import sample_row, sample_data, load_data
+from tunedgemini.async_eval import run_batch
+from tunedgemini.prediction_cache import prediction_key
+from tunedgemini.token_budget import estimate_tokens, print_token_report
+from tunedgemini.metrics import METRICS, timed
+from tunedgemini.eval_stats import CIWidthStop, PairedComparison, StreamingMetrics, pairwise_tests
+from tunedgemini.label_matcher import LabelMatcher
+from tunedgemini.cascade import LocalClassifier
+from tunedgemini.few_shot import FewShotContext, min_cache_tokens, select_examples
 from google import genai
 from google.genai import types
 from google.api_core import retry
@@ -15,15 +29,13 @@ originates.
 """
 warnings.filterwarnings("ignore", category=tqdm.TqdmExperimentalWarning)
 
+# Built once; the config is the same for every zero-shot request.
+_zero_shot_config = types.GenerateContentConfig(system_instruction=system_instruct)
+
 is_retriable = lambda e: (isinstance(e, genai.errors.APIError) and e.code in {429, 503})
-@retry.Retry(predicate=is_retriable)
-def predict_label(post: str, client, model_id) -> str:
-    response = client.models.generate_content(
-        model=model_id,
-        config=types.GenerateContentConfig(
-            system_instruction=system_instruct),
-        contents=post)
 
+
+def _label_from_response(response) -> str:
     rc = response.candidates[0]
 
     # Any errors, filters, recitation, etc we can mark as a general error
@@ -31,34 +43,420 @@ def predict_label(post: str, client, model_id) -> str:
         return "(error)"
     else:
         # Clean up the response.
-        return response.text.strip()        
-def eval_model(client, df_test, model_id):
+        return response.text.strip()
+
+
+@retry.Retry(predicate=is_retriable, on_error=METRICS.record_retry)
+def _generate(client, model_id, contents, config=None):
+    start = METRICS.request_start()
+    response = client.models.generate_content(
+        model=model_id, config=config, contents=contents)
+    METRICS.record_request(model_id, start, response)
+    return response
+
+
+@retry.AsyncRetry(predicate=is_retriable, on_error=METRICS.record_retry)
+async def _generate_async(client, model_id, contents, config=None):
+    start = METRICS.request_start()
+    response = await client.aio.models.generate_content(
+        model=model_id, config=config, contents=contents)
+    METRICS.record_request(model_id, start, response)
+    return response
+
+
+def _cache_lookup(cache, model_id, text, config):
+    if cache is None:
+        return None, None
+    key = prediction_key(model_id, text, system_instruction=getattr(config, "system_instruction", None), config=config)
+    return key, cache.get(key)
+
+
+def _cache_store(cache, key, model_id, prediction):
+    # Blocked or truncated responses may be transient, so don't pin them.
+    if cache is not None and prediction != "(error)":
+        cache.put(key, prediction, model_id=model_id)
+
+
+def predict_label(post: str, client, model_id, cache=None) -> str:
+    config = _zero_shot_config
+    key, cached = _cache_lookup(cache, model_id, post, config)
+    if cached is not None:
+        return cached
+
+    label = _label_from_response(_generate(client, model_id, post, config))
+    _cache_store(cache, key, model_id, label)
+    return label
+
+
+async def predict_label_async(post: str, client, model_id, cache=None) -> str:
+    config = _zero_shot_config
+    key, cached = _cache_lookup(cache, model_id, post, config)
+    if cached is not None:
+        return cached
+
+    label = _label_from_response(await _generate_async(client, model_id, post, config))
+    _cache_store(cache, key, model_id, label)
+    return label
+
+
+# Enough for the longest newsgroup name; the enum schema rules out anything longer.
+ENUM_MAX_OUTPUT_TOKENS = 16
+
+
+def _enum_config(model_id, class_names, max_output_tokens=ENUM_MAX_OUTPUT_TOKENS):
+    # Tuned models get the bare post, as in unconstrained mode and in tuning.
+    tuned = model_id.startswith("tunedModels/")
+    return _enum_config_cached(tuple(class_names), max_output_tokens, tuned)
+
+
+@functools.lru_cache(maxsize=32)
+def _enum_config_cached(class_names, max_output_tokens, tuned=False):
+    return types.GenerateContentConfig(
+        system_instruction=None if tuned else system_instruct,
+        response_mime_type="text/x.enum",
+        response_schema=types.Schema(type=types.Type.STRING, enum=list(class_names)),
+        max_output_tokens=max_output_tokens,
+    )
+
+
+def _label_from_enum_response(response, matcher) -> str:
+    rc = response.candidates[0]
+
+    # A truncated answer may still name the label, so only blocked or empty
+    # responses count as errors.
+    if rc.finish_reason.name not in ("STOP", "MAX_TOKENS") or not response.text:
+        return "(error)"
+    text = response.text.strip()
+    return matcher.match(text) or text
+
+
+def predict_label_enum(post: str, client, model_id, matcher, cache=None) -> str:
+    """Like predict_label, but the model may only answer with one of matcher.labels."""
+    config = _enum_config(model_id, matcher.labels)
+    key, cached = _cache_lookup(cache, model_id, post, config)
+    if cached is not None:
+        return cached
+
+    label = _label_from_enum_response(_generate(client, model_id, post, config), matcher)
+    _cache_store(cache, key, model_id, label)
+    return label
+
+
+async def predict_label_enum_async(post: str, client, model_id, matcher, cache=None) -> str:
+    config = _enum_config(model_id, matcher.labels)
+    key, cached = _cache_lookup(cache, model_id, post, config)
+    if cached is not None:
+        return cached
+
+    label = _label_from_enum_response(await _generate_async(client, model_id, post, config), matcher)
+    _cache_store(cache, key, model_id, label)
+    return label
+
 
-    
-    tqdmr.pandas()
+def _few_shot_key(cache, model_id, post, context):
+    if cache is None:
+        return None, None
+    # Keyed on the examples rather than the config, whose cache name changes on
+    # every upload; cached and inline requests ask the same question.
+    key = prediction_key(model_id, post, system_instruction=system_instruct,
+                         config={"few_shot": context.fingerprint})
+    return key, cache.get(key)
 
-    # But suppress the experimental warning
+
+def predict_label_few_shot(post: str, client, context, cache=None) -> str:
+    """Classify post with the examples of a FewShotContext in front of it."""
+    key, cached = _few_shot_key(cache, context.model_id, post, context)
+    if cached is not None:
+        return cached
+
+    start = time.perf_counter()
+    response = _generate(client, context.model_id, context.contents(post), context.config)
+    context.record(start, post, response)
+    label = _label_from_response(response)
+    _cache_store(cache, key, context.model_id, label)
+    return label
+
+
+async def predict_label_few_shot_async(post: str, client, context, cache=None) -> str:
+    key, cached = _few_shot_key(cache, context.model_id, post, context)
+    if cached is not None:
+        return cached
+
+    start = time.perf_counter()
+    response = await _generate_async(client, context.model_id, context.contents(post), context.config)
+    context.record(start, post, response)
+    label = _label_from_response(response)
+    _cache_store(cache, key, context.model_id, label)
+    return label
+
+
+def _enum_predictors(client, model_id, df_eval, cache=None):
+    """Constrained predictors over the `Class Name` categories of df_eval."""
+    matcher = LabelMatcher(df_eval["Class Name"].astype("category").cat.categories)
+    return (lambda text: predict_label_enum(text, client, model_id, matcher, cache=cache),
+            lambda text: predict_label_enum_async(text, client, model_id, matcher, cache=cache),
+            matcher)
+
+
+def _predict_texts(df_eval, model_id, predict, predict_async, concurrency=None, checkpoint=None,
+                   observe=None, stop=None, config=None):
+    """Predictions for df_eval["Text"], skipping posts already in `checkpoint`.
+
+    Each new prediction is logged to the checkpoint as soon as it is made,
+    so an interrupted run picks up where it stopped; `config` is the
+    generation config the predictors use, which the checkpoint keys on so
+    other modes' predictions are never reused. observe(i, prediction)
+    sees every prediction, checkpointed ones first; once stop() is true no
+    new requests are started and the remaining rows are left as None.
+    """
+    rows = list(df_eval["Text"].items())
+    predictions = [None] * len(rows)
+    pending = []
+    for i, (row, text) in enumerate(rows):
+        found = checkpoint.get(model_id, text, config) if checkpoint is not None else None
+        if found is None:
+            pending.append(i)
+        else:
+            predictions[i] = found
+            if observe is not None:
+                observe(i, found)
+    if checkpoint is not None and len(pending) < len(rows):
+        print(f"Resuming from {checkpoint.path}: {len(rows) - len(pending)} of {len(rows)} rows done")
+
+    if stop is not None:
+        # Rows arrive grouped by class; visit them in random order so a run
+        # that stops early has still seen a representative sample.
+        pending = [pending[j] for j in np.random.default_rng(0).permutation(len(pending))]
+
+    def done(i, prediction):
+        if checkpoint is not None:
+            checkpoint.record(model_id, rows[i][1], prediction, config)
+        predictions[i] = prediction
+        if observe is not None:
+            observe(i, prediction)
+
+    if concurrency:
+        async def predict_one(i):
+            done(i, await predict_async(rows[i][1]))
+
+        run_batch(pending, predict_one, concurrency=concurrency, stop=stop)
+    else:
+        for i in tqdmr(pending):
+            if stop is not None and stop():
+                break
+            done(i, predict(rows[i][1]))
+    return predictions
+
+
+def _predictors(client, model_id, cache=None):
+    """Sync and async single-post predictors for a base or tuned model."""
+    if model_id.startswith("tunedModels/"):
+        return (lambda text: classify_text(client, text, model_id, cache=cache),
+                lambda text: classify_text_async(client, text, model_id, cache=cache))
+    return (lambda text: predict_label(text, client, model_id, cache=cache),
+            lambda text: predict_label_async(text, client, model_id, cache=cache))
+
+
+def _streaming_eval(df_eval, model_id, predict, predict_async, concurrency, checkpoint, ci_width, config=None):
+    """Fill df_eval["Prediction"], tracking metrics as predictions arrive.
+
+    With ci_width set, stops once the accuracy interval is narrower than it
+    and drops the rows that were never predicted. The StreamingMetrics are
+    kept in df_eval.attrs["metrics"].
+    """
+    metrics = StreamingMetrics()
+    truth = list(df_eval["Class Name"])
+    rule = CIWidthStop(ci_width) if ci_width else None
+    df_eval["Prediction"] = _predict_texts(
+        df_eval, model_id, predict, predict_async, concurrency=concurrency, checkpoint=checkpoint,
+        observe=lambda i, prediction: metrics.update(truth[i], prediction),
+        stop=(lambda: rule(metrics)) if rule else None, config=config)
+
+    if metrics.n < len(df_eval):
+        print(f"Stopped after {metrics.n} of {len(df_eval)} rows: CI narrower than {ci_width:.1%}")
+        df_eval = df_eval[df_eval["Prediction"].notna()].copy()
+    df_eval.attrs["metrics"] = metrics
+    return df_eval
+
+
+@timed("eval_model")
+def eval_model(client, df_test, model_id, num_samples=2, concurrency=None, cache=None, checkpoint=None,
+               seed=None, ci_width=None, constrained=False):
+    """Evaluate a base model on df_test.
+
+    num_samples rows per class are evaluated, or the whole of df_test when
+    num_samples is None. With `concurrency` set, predictions run through the
+    async client with that many requests in flight. Pass a PredictionCache
+    as `cache` to reuse predictions from earlier runs, and an EvalCheckpoint
+    as `checkpoint` to make the run resumable; sampling then defaults to
+    seed 0 so a restarted run sees the same rows. With `ci_width` set, rows
+    are visited in random order and the run stops once the 95% interval on
+    accuracy is narrower than ci_width. constrained=True restricts answers
+    to the `Class Name` categories through an enum response schema.
+    """
+
+    # Suppress the tqdm.rich experimental warning
     warnings.filterwarnings("ignore", category=tqdm.TqdmExperimentalWarning)
 
 
     # Further sample the test data to be mindful of the free-tier quota.
-    df_baseline_eval = sample_data(df_test, 2, '.*')
+    if checkpoint is not None and seed is None:
+        seed = 0
+    if num_samples is None:
+        df_baseline_eval = df_test.copy()
+    else:
+        df_baseline_eval = sample_data(df_test, num_samples, '.*', seed=seed)
+    print_token_report(df_baseline_eval['Text'], f"Eval data for {model_id}")
 
     # Make predictions using the sampled data.
-    df_baseline_eval['Prediction'] = df_baseline_eval['Text'].progress_apply(lambda text: predict_label(text, client, model_id))
+    if constrained:
+        predict, predict_async, matcher = _enum_predictors(client, model_id, df_baseline_eval, cache)
+        config = _enum_config(model_id, matcher.labels)
+    else:
+        predict = lambda text: predict_label(text, client, model_id, cache=cache)
+        predict_async = lambda text: predict_label_async(text, client, model_id, cache=cache)
+        config = _zero_shot_config
+    df_baseline_eval = _streaming_eval(
+        df_baseline_eval, model_id, predict, predict_async, concurrency, checkpoint, ci_width, config)
+    if constrained:
+        print(f"Near-miss answers mapped to a label: {matcher.corrections}")
 
-    # And calculate the accuracy.
-    accuracy = (df_baseline_eval["Class Name"] == df_baseline_eval["Prediction"]).sum() / len(df_baseline_eval)
+    # And report the accuracy.
     print(df_baseline_eval.head())
-    print(f"Accuracy: {accuracy:.2%}")
+    print(f"Accuracy: {df_baseline_eval.attrs['metrics'].summary()}")
     return df_baseline_eval
 
 
-@retry.Retry(predicate=is_retriable)
-def classify_text(client, text: str, model_id: str) -> str:
-    """Classify the provided text into a known newsgroup."""
-    response = client.models.generate_content(
-        model=model_id, contents=text)
+batch_instruct = system_instruct + """
+Each request contains several posts, numbered "Post 1", "Post 2" and so on.
+Respond with a JSON array holding one {"id": <post number>, "label": <newsgroup>}
+object per post.
+"""
+
+
+def _batch_config(class_names):
+    return types.GenerateContentConfig(
+        system_instruction=batch_instruct,
+        response_mime_type="application/json",
+        response_schema=types.Schema(
+            type=types.Type.ARRAY,
+            items=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    "id": types.Schema(type=types.Type.INTEGER),
+                    "label": types.Schema(type=types.Type.STRING, enum=list(class_names)),
+                },
+                required=["id", "label"],
+            ),
+        ),
+    )
+
+
+def pack_batches(texts, max_items=20, max_tokens=8000):
+    """Group positions of texts into batches that fit max_items and max_tokens."""
+    batch, used = [], 0
+    for idx, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if batch and (len(batch) >= max_items or used + tokens > max_tokens):
+            yield batch
+            batch, used = [], 0
+        batch.append(idx)
+        used += tokens
+    if batch:
+        yield batch
+
+
+def _labels_from_batch_response(response, num_posts, class_names):
+    # Anything short of one valid label per post counts as malformed.
+    rc = response.candidates[0]
+    if rc.finish_reason.name != "STOP":
+        return None
+    try:
+        items = json.loads(response.text)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(items, list):
+        return None
+
+    labels = {}
+    for item in items:
+        if (isinstance(item, dict) and isinstance(item.get("id"), int)
+                and 1 <= item["id"] <= num_posts and item.get("label") in class_names):
+            labels[item["id"]] = item["label"]
+    if len(labels) != num_posts:
+        return None
+    return [labels[i] for i in range(1, num_posts + 1)]
+
+
+def classify_batch(texts, client, model_id, class_names, stats=None, matcher=None):
+    """Label several posts with one request, splitting the batch on bad responses.
+
+    A batch that comes back malformed or partial is halved and each half is
+    retried; a single post falls back to predict_label_enum, so it is held to
+    the same class_names as a batch. `stats` (a dict) counts requests and splits.
+    """
+    stats = stats if stats is not None else {}
+    if len(texts) == 1:
+        stats["requests"] = stats.get("requests", 0) + 1
+        matcher = matcher or LabelMatcher(class_names)
+        return [predict_label_enum(texts[0], client, model_id, matcher)]
+
+    contents = "\n\n".join(f"Post {i}:\n{text}" for i, text in enumerate(texts, 1))
+    stats["requests"] = stats.get("requests", 0) + 1
+    response = _generate(client, model_id, contents, _batch_config(class_names))
+    labels = _labels_from_batch_response(response, len(texts), set(class_names))
+    if labels is not None:
+        return labels
+
+    stats["splits"] = stats.get("splits", 0) + 1
+    middle = len(texts) // 2
+    matcher = matcher or LabelMatcher(class_names)
+    return (classify_batch(texts[:middle], client, model_id, class_names, stats, matcher)
+            + classify_batch(texts[middle:], client, model_id, class_names, stats, matcher))
+
+
+@timed("eval_model_batched")
+def eval_model_batched(client, df_test, model_id, num_samples=2, max_items=20, max_tokens=8000,
+                       compare=False):
+    """Evaluate a base model with several posts per request.
+
+    Allowed labels are the `Class Name` categories. With compare=True the same
+    rows are also classified one post per request, and accuracy, agreement and
+    request counts of both modes are reported.
+    """
+    if num_samples is None:
+        df_eval = df_test.copy()
+    else:
+        df_eval = sample_data(df_test, num_samples, '.*')
+    print_token_report(df_eval['Text'], f"Eval data for {model_id}")
+
+    class_names = list(df_eval["Class Name"].astype("category").cat.categories)
+    texts = df_eval["Text"].tolist()
+    predictions = [None] * len(texts)
+    stats = {"requests": 0, "splits": 0}
+
+    batches = list(pack_batches(texts, max_items, max_tokens))
+    for batch in tqdmr(batches):
+        labels = classify_batch([texts[i] for i in batch], client, model_id, class_names, stats)
+        for idx, label in zip(batch, labels):
+            predictions[idx] = label
+    df_eval["Prediction"] = predictions
+
+    accuracy = (df_eval["Class Name"] == df_eval["Prediction"]).sum() / len(df_eval)
+    print(f"Batched accuracy: {accuracy:.2%} with {stats['requests']} requests "
+          f"for {len(df_eval)} posts ({stats['splits']} splits)")
+
+    if compare:
+        df_eval["Single Prediction"] = [predict_label(text, client, model_id) for text in tqdmr(texts)]
+        single_accuracy = (df_eval["Class Name"] == df_eval["Single Prediction"]).sum() / len(df_eval)
+        agreement = (df_eval["Prediction"] == df_eval["Single Prediction"]).mean()
+        print(f"Single-item accuracy: {single_accuracy:.2%} with {len(df_eval)} requests")
+        print(f"Accuracy delta: {accuracy - single_accuracy:+.2%}, agreement: {agreement:.2%}")
+
+    return df_eval
+
+
+def _text_from_response(response) -> str:
     rc = response.candidates[0]
 
     # Any errors, filters, recitation, etc we can mark as a general error
@@ -68,15 +466,326 @@ def classify_text(client, text: str, model_id: str) -> str:
         return rc.content.parts[0].text
 
 
-def eval_tuned_model(client, df_test, model_id):
+def classify_text(client, text: str, model_id: str, cache=None) -> str:
+    """Classify the provided text into a known newsgroup."""
+    key, cached = _cache_lookup(cache, model_id, text, None)
+    if cached is not None:
+        return cached
+
+    label = _text_from_response(_generate(client, model_id, text))
+    _cache_store(cache, key, model_id, label)
+    return label
+
+
+async def classify_text_async(client, text: str, model_id: str, cache=None) -> str:
+    """Async variant of classify_text, for use with async_eval."""
+    key, cached = _cache_lookup(cache, model_id, text, None)
+    if cached is not None:
+        return cached
+
+    label = _text_from_response(await _generate_async(client, model_id, text))
+    _cache_store(cache, key, model_id, label)
+    return label
+
+
+@timed("eval_tuned_model")
+def eval_tuned_model(client, df_test, model_id, num_samples=4, concurrency=None, cache=None,
+                     checkpoint=None, seed=None, ci_width=None, constrained=False):
 
     # The sampling here is just to minimise your quota usage. If you can, you should
-    # evaluate the whole test set with `df_model_eval = df_test.copy()`.
+    # evaluate the whole test set by passing `num_samples=None`.
+
+    if checkpoint is not None and seed is None:
+        seed = 0
+    if num_samples is None:
+        df_model_eval = df_test.copy()
+    else:
+        df_model_eval = sample_data(df_test, num_samples, '.*', seed=seed)
+    print_token_report(df_model_eval["Text"], f"Eval data for {model_id}")
+
+    if constrained:
+        predict, predict_async, matcher = _enum_predictors(client, model_id, df_model_eval, cache)
+        config = _enum_config(model_id, matcher.labels)
+    else:
+        predict = lambda text: classify_text(client, text, model_id, cache=cache)
+        predict_async = lambda text: classify_text_async(client, text, model_id, cache=cache)
+        config = None
+    df_model_eval = _streaming_eval(
+        df_model_eval, model_id, predict, predict_async, concurrency, checkpoint, ci_width, config)
+    if constrained:
+        print(f"Near-miss answers mapped to a label: {matcher.corrections}")
+
+    print(f"Accuracy: {df_model_eval.attrs['metrics'].summary()}")
+    return df_model_eval
+
+
+def compare_models(client, df_test, model_a, model_b, num_samples=None, concurrency=None, cache=None,
+                   alpha=0.05, seed=0):
+    """Evaluate two models on the same posts, stopping once one is significantly better.
+
+    eval_models with sequential=True: each post is sent to both models, rows
+    are visited in random order and the run ends as soon as the paired
+    sequential test (see PairedComparison) rejects equal accuracy at level
+    alpha, or the sample runs out. Returns the evaluated rows, with the
+    predictions in "Prediction A" and "Prediction B", and the PairedComparison.
+    """
+    df_eval = eval_models(client, df_test, [model_a, model_b], num_samples=num_samples, concurrency=concurrency,
+                          cache=cache, seed=seed, alpha=alpha, sequential=True)
+    comparison = df_eval.attrs["comparison"]
+    df_eval = df_eval.rename(columns={model_a: "Prediction A", model_b: "Prediction B"})
+    print(comparison.summary())
+    return df_eval, comparison
+
+
+def _predictor_config(model_id):
+    """The generation config _predictors' predictors send, for checkpoint keys."""
+    return None if model_id.startswith("tunedModels/") else _zero_shot_config
+
+
+def _model_predictors(client, model_id, cache, seconds, checkpoint=None):
+    """_predictors for one model of a fan-out, timing every API request into `seconds`.
+
+    Posts answered from the checkpoint or the prediction cache are not timed,
+    so `seconds` holds one latency per request actually sent. With a
+    checkpoint, new predictions are logged to it.
+    """
+    # The cache is consulted here rather than inside the predictors, so hits
+    # can be told apart from requests; the key is the one they would use.
+    predict, predict_async = _predictors(client, model_id)
+    config = _predictor_config(model_id)
+
+    def resumed(text):
+        return checkpoint.get(model_id, text, config) if checkpoint is not None else None
+
+    def log(text, prediction):
+        if checkpoint is not None:
+            checkpoint.record(model_id, text, prediction, config)
+        return prediction
+
+    def sent(key, prediction, start):
+        seconds.append(time.perf_counter() - start)
+        _cache_store(cache, key, model_id, prediction)
+        return prediction
+
+    def timed_predict(text):
+        found = resumed(text)
+        if found is not None:
+            return found
+        key, cached = _cache_lookup(cache, model_id, text, config)
+        if cached is not None:
+            return log(text, cached)
+        start = time.perf_counter()
+        return log(text, sent(key, predict(text), start))
+
+    async def timed_predict_async(text):
+        found = resumed(text)
+        if found is not None:
+            return found
+        key, cached = _cache_lookup(cache, model_id, text, config)
+        if cached is not None:
+            return log(text, cached)
+        start = time.perf_counter()
+        return log(text, sent(key, await predict_async(text), start))
+
+    return timed_predict, timed_predict_async
+
+
+@timed("eval_models")
+def eval_models(client, df_test, model_ids, num_samples=4, concurrency=None, cache=None, checkpoint=None,
+                seed=0, alpha=0.05, sequential=False):
+    """Evaluate several models on one shared sample in a single pass.
+
+    One seeded sample of num_samples rows per class (all of df_test when
+    None) is drawn, and every row is sent to all models at once, so up to
+    concurrency x len(model_ids) requests are in flight. Base and tuned
+    models can be mixed; an EvalCheckpoint makes the run resumable per model.
+    Returns the sample with one prediction column per model id;
+    df.attrs["models"] holds per-model accuracy and latency and
+    df.attrs["pairwise"] the paired McNemar tests (see pairwise_tests).
+
+    sequential=True (two models only) visits rows in random order and stops
+    once PairedComparison finds one model better, keeping only the rows
+    evaluated; the PairedComparison is in df.attrs["comparison"].
+    """
+    warnings.filterwarnings("ignore", category=tqdm.TqdmExperimentalWarning)
+    model_ids = list(dict.fromkeys(model_ids))
+    if sequential and len(model_ids) != 2:
+        raise ValueError("sequential comparison needs exactly two distinct models")
+    if num_samples is None:
+        df_eval = df_test.copy()
+    else:
+        df_eval = sample_data(df_test, num_samples, '.*', seed=seed)
+    print_token_report(df_eval["Text"], f"Eval data for {len(model_ids)} models")
+
+    seconds = {model_id: [] for model_id in model_ids}
+    predictors = [_model_predictors(client, model_id, cache, seconds[model_id], checkpoint)
+                  for model_id in model_ids]
+
+    async def predict_all_async(text):
+        return tuple(await asyncio.gather(*(predict_async(text) for _, predict_async in predictors)))
+
+    truth = list(df_eval["Class Name"])
+    comparison = PairedComparison(alpha=alpha) if sequential else None
+    start = time.perf_counter()
+    predictions = _predict_texts(
+        df_eval, " vs ".join(model_ids),
+        lambda text: tuple(predict(text) for predict, _ in predictors), predict_all_async,
+        concurrency=concurrency,
+        observe=(lambda i, row: comparison.update(truth[i], *row)) if comparison else None,
+        stop=comparison)
+    elapsed = time.perf_counter() - start
+
+    done = [row is not None for row in predictions]
+    df_eval = df_eval[done].copy()
+    truth = [label for label, kept in zip(truth, done) if kept]
+    predictions = [row for row in predictions if row is not None]
+    for j, model_id in enumerate(model_ids):
+        df_eval[model_id] = [row[j] for row in predictions]
+
+    rows = []
+    for model_id in model_ids:
+        metrics = StreamingMetrics()
+        for label, prediction in zip(truth, df_eval[model_id]):
+            metrics.update(label, prediction)
+        low, high = metrics.interval()
+        latency = np.array(seconds[model_id]) if seconds[model_id] else np.full(1, np.nan)
+        rows.append({
+            "model_id": model_id,
+            "accuracy": metrics.accuracy,
+            "ci_low": low,
+            "ci_high": high,
+            "errors": int((df_eval[model_id] == "(error)").sum()),
+            "requests": len(seconds[model_id]),
+            "mean_seconds": float(latency.mean()),
+            "p50_seconds": float(np.percentile(latency, 50)),
+            "p95_seconds": float(np.percentile(latency, 95)),
+        })
+    models = pd.DataFrame(rows).set_index("model_id")
+    pairwise = pairwise_tests(truth, {model_id: df_eval[model_id] for model_id in model_ids}, alpha=alpha)
+
+    print(f"Evaluated {len(model_ids)} models on the same {len(df_eval)} of {len(done)} posts in {elapsed:.2f}s")
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(models.to_string(float_format=lambda x: f"{x:.3f}"))
+        print(pairwise.to_string(index=False, float_format=lambda x: f"{x:.3g}"))
+    df_eval.attrs["models"] = models
+    df_eval.attrs["pairwise"] = pairwise
+    if comparison is not None:
+        df_eval.attrs["comparison"] = comparison
+    return df_eval
+
+
+@timed("eval_model_cascade")
+def eval_model_cascade(client, df_train, df_test, model_id, num_samples=2, target_accuracy=0.95,
+                       concurrency=None, cache=None, compare=False, seed=None):
+    """Evaluate a cascade: a local TF-IDF model first, `model_id` for the rest.
+
+    The local classifier is trained on df_train and answers the test posts it
+    is confident about (see cascade.LocalClassifier); only the others are sent
+    to the model. Reports offload rate, wall time and accuracy; with
+    compare=True every post is also sent to the model, for the all-remote
+    baseline. Tuned models are queried like eval_tuned_model does.
+    """
+    warnings.filterwarnings("ignore", category=tqdm.TqdmExperimentalWarning)
+    if num_samples is None:
+        df_eval = df_test.copy()
+    else:
+        df_eval = sample_data(df_test, num_samples, '.*', seed=seed)
+    predict, predict_async = _predictors(client, model_id, cache)
+
+    start = time.perf_counter()
+    local = LocalClassifier(target_accuracy).fit(df_train["Text"], df_train["Class Name"].astype(str))
+    train_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    labels, confidence = local.predict(df_eval["Text"])
+    offload = local.confident(confidence)
+    df_remote = df_eval[~offload]
+    remote = _predict_texts(df_remote, model_id, predict, predict_async, concurrency=concurrency)
+    cascade_seconds = time.perf_counter() - start
+
+    df_eval["Local Prediction"] = labels
+    df_eval["Local Confidence"] = confidence
+    df_eval["Prediction"] = labels.astype(object)
+    df_eval.loc[~offload, "Prediction"] = remote
+    correct = df_eval["Class Name"] == df_eval["Prediction"]
+    print(f"Local model: trained in {train_seconds:.2f}s, threshold {local.threshold:.3f}")
+    print(f"Offloaded {offload.sum()} of {len(df_eval)} posts ({offload.mean():.1%}), "
+          f"local accuracy {correct[offload].mean() if offload.any() else float('nan'):.2%}")
+    print(f"Cascade: accuracy {correct.mean():.2%}, {len(df_remote)} requests, {cascade_seconds:.2f}s")
+
+    if compare:
+        # Uncached, so the baseline pays for every request the cascade made.
+        predict, predict_async = _predictors(client, model_id)
+        start = time.perf_counter()
+        df_eval["Remote Prediction"] = _predict_texts(df_eval, model_id, predict, predict_async,
+                                                      concurrency=concurrency)
+        remote_seconds = time.perf_counter() - start
+        remote_accuracy = (df_eval["Class Name"] == df_eval["Remote Prediction"]).mean()
+        print(f"All-remote: accuracy {remote_accuracy:.2%}, {len(df_eval)} requests, {remote_seconds:.2f}s")
+        print(f"Accuracy delta: {correct.mean() - remote_accuracy:+.2%}, "
+              f"requests saved: {offload.mean():.1%}, wall time x{remote_seconds / max(cascade_seconds, 1e-9):.1f} faster")
+
+    return df_eval
+
+
+@timed("eval_model_few_shot")
+def eval_model_few_shot(client, df_train, df_test, model_id, k=2, num_samples=2, concurrency=None,
+                        cache=None, compare_inline=False, seed=None, ttl="3600s"):
+    """Evaluate a base model with k or more examples per class from df_train.
+
+    The examples and the system instruction are uploaded once as a context
+    cache (see few_shot.FewShotContext), so each request sends only the post.
+    More than k examples per class are used if that is what it takes to reach
+    the model's minimum cache size. df.attrs["few_shot"] records whether the
+    cache was used, and if not why. With compare_inline=True the same posts
+    are also classified with the examples inlined in every request
+    (df.attrs["few_shot_inline"]); the per-request latency and input-token
+    savings are reported in df.attrs["few_shot_savings"], and only when the
+    first run really did use the cache.
+    """
+    warnings.filterwarnings("ignore", category=tqdm.TqdmExperimentalWarning)
+    if num_samples is None:
+        df_eval = df_test.copy()
+    else:
+        df_eval = sample_data(df_test, num_samples, '.*', seed=seed)
+    examples = select_examples(df_train, k=k, min_tokens=min_cache_tokens(model_id))
+    print(f"Few-shot examples: {len(examples)} posts, ~{estimate_tokens(' '.join(examples['Text']))} tokens")
 
+    def run(context, cache):
+        df_run = _streaming_eval(
+            df_eval.copy(), model_id,
+            lambda text: predict_label_few_shot(text, client, context, cache=cache),
+            lambda text: predict_label_few_shot_async(text, client, context, cache=cache),
+            concurrency, None, None)
+        per = context.per_request()
+        mode = "cached context" if context.stats["cached"] else f"inline examples ({context.stats['fallback']})"
+        print(f"{mode}: {per['seconds'] * 1000:.0f} ms and {per['input_tokens']:.0f} input tokens per request, "
+              f"accuracy {df_run.attrs['metrics'].summary()}")
+        return df_run, per
 
-    df_model_eval = sample_data(df_test, 4, '.*')
+    context = FewShotContext(client, model_id, examples, system_instruct, ttl=ttl)
+    try:
+        df_eval, cached = run(context, cache)
+    finally:
+        context.close()
+    df_eval.attrs["few_shot"] = context.stats
 
-    df_model_eval["Prediction"] = df_model_eval["Text"].progress_apply(lambda text: classify_text(client, text, model_id))
+    if compare_inline:
+        # Uncached, so the baseline pays for every request.
+        inline = FewShotContext(client, model_id, examples, system_instruct, use_cache=False)
+        df_inline, inlined = run(inline, None)
+        df_eval["Inline Prediction"] = df_inline["Prediction"]
+        df_eval.attrs["few_shot_inline"] = inline.stats
+        if not context.stats["cached"]:
+            print(f"No savings to report: the cached run fell back to inline examples "
+                  f"({context.stats['fallback']})")
+        elif context.stats["requests"] and inlined["input_tokens"]:
+            savings = {
+                "latency": 1 - cached["seconds"] / max(inlined["seconds"], 1e-9),
+                "input_tokens": 1 - cached["input_tokens"] / inlined["input_tokens"],
+            }
+            df_eval.attrs["few_shot_savings"] = savings
+            print(f"Cached vs inline, per request: latency reduced by {savings['latency']:.1%}, "
+                  f"input tokens reduced by {savings['input_tokens']:.1%}")
 
-    accuracy = (df_model_eval["Class Name"] == df_model_eval["Prediction"]).sum() / len(df_model_eval)
-    print(f"Accuracy: {accuracy:.2%}")
\ No newline at end of file
+    return df_eval
@@ -0,0 +1,152 @@
+"""
+Disk-backed cache of model predictions.
+
+Entries are keyed by a hash of (model_id, system_instruction, generation
+config, text), so re-running an evaluation on the same posts with the same
+model does not spend API quota again.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(
+    os.environ.get("TUNEDGEMINI_CACHE_DIR", Path.home() / ".cache" / "tunedgemini")
+) / "predictions.sqlite"
+
+# Run eviction after this many writes.
+_EVICT_EVERY = 256
+
+
+def _config_to_dict(config):
+    if config is None:
+        return None
+    if hasattr(config, "model_dump"):
+        return config.model_dump(mode="json", exclude_none=True)
+    return config
+
+
+def config_fingerprint(system_instruction=None, config=None):
+    """Short hash of the instruction and generation config a prediction was made with."""
+    payload = json.dumps([system_instruction, _config_to_dict(config)], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def prediction_key(model_id, text, system_instruction=None, config=None):
+    """Content hash identifying a single prediction request."""
+    payload = json.dumps(
+        [model_id, system_instruction, _config_to_dict(config), text],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """SQLite store mapping prediction keys to model outputs.
+
+    max_entries and max_age (seconds) bound the cache; the least recently
+    used entries are dropped first. With bypass=True every lookup misses and
+    nothing is written.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=100_000, max_age=30 * 24 * 3600, bypass=False):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " key TEXT PRIMARY KEY,"
+            " model_id TEXT,"
+            " value TEXT,"
+            " created REAL,"
+            " accessed REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS predictions_accessed ON predictions(accessed)")
+        self.evict()
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        if self.bypass:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM predictions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.max_age is not None and now - row[1] > self.max_age:
+                self._conn.execute("DELETE FROM predictions WHERE key = ?", (key,))
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE predictions SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, value, model_id=None):
+        if self.bypass:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO predictions (key, model_id, value, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, model_id, value, now, now),
+            )
+            self._writes += 1
+            due = self._writes % _EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries and trim the cache to max_entries."""
+        with self._lock:
+            if self.max_age is not None:
+                self._conn.execute(
+                    "DELETE FROM predictions WHERE created < ?", (time.time() - self.max_age,)
+                )
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM predictions WHERE key IN ("
+                    " SELECT key FROM predictions ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM predictions")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self):
+        self._conn.close()
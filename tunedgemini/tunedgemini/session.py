@@ -0,0 +1,48 @@
+"""
+Shared setup for the CLI and the scripts in tuning-tasks/.
+
+Only the standard library is imported at module level, so importing this
+from the CLI keeps `tunedgemini --help` fast; the heavy imports happen inside
+each helper.
+"""
+
+import os
+
+DEFAULT_BASE_MODEL = "gemini-1.5-flash-001"
+
+
+def load_env():
+    import dotenv
+    dotenv.load_dotenv()
+
+
+def make_client():
+    """A genai.Client using GOOGLE_API_KEY from the environment or .env."""
+    load_env()
+    from google import genai
+    return genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
+
+
+def prediction_cache(no_cache=False):
+    """The default PredictionCache; bypassed with no_cache or TUNEDGEMINI_NO_CACHE=1."""
+    from tunedgemini.prediction_cache import PredictionCache
+    return PredictionCache(bypass=no_cache or os.environ.get("TUNEDGEMINI_NO_CACHE") == "1")
+
+
+def load_frames(seed=0, workers=1, max_tokens=2000):
+    """Seeded train/test frames, with posts trimmed to max_tokens (0 keeps them whole)."""
+    from tunedgemini.data_loader import load_data
+    from tunedgemini.token_budget import apply_token_budget
+
+    df_train, df_test = load_data(workers=workers, lazy=True, seed=seed)
+    if max_tokens:
+        df_train = apply_token_budget(df_train, max_tokens)
+        df_test = apply_token_budget(df_test, max_tokens)
+    return df_train, df_test
+
+
+def export_metrics():
+    """Write METRICS to TUNEDGEMINI_METRICS_PATH (default metrics.json) if enabled."""
+    from tunedgemini.metrics import METRICS
+    if METRICS.enabled:
+        METRICS.export(os.environ.get("TUNEDGEMINI_METRICS_PATH", "metrics.json"))
@@ -0,0 +1,279 @@
+"""
+Hyperparameter sweeps over tuning jobs.
+
+A Sweep takes a list of hyperparameter dicts (see grid_search and
+random_search) and keeps up to max_concurrent tuning jobs running, starting
+the next config as soon as a job ends. Each model that finishes tuning is
+evaluated right away, in rungs over one shared, shuffled sample of df_test,
+so every trial is scored on the same rows. After each rung a trial is pruned
+if another trial is at least as cheap and as fast to tune and its accuracy
+interval lies wholly above the pruned trial's. leaderboard() reports
+accuracy against tuning wall time and training tokens (and cost, given a
+price).
+
+Jobs are tracked with a TuningMonitor, so a SimulatedTunings backend on a
+FakeClock runs a sweep end to end in seconds.
+"""
+
+import asyncio
+import itertools
+import math
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from tunedgemini.async_eval import gather_ordered
+from tunedgemini.data_loader import sample_data
+from tunedgemini.eval_stats import StreamingMetrics
+from tunedgemini.fine_tune import TUNING_CONFIG, start_tuning, tuning_examples
+from tunedgemini.metrics import METRICS
+from tunedgemini.model_registry import FAILED_STATES, dataset_fingerprint
+from tunedgemini.predict_eval import _predictors
+from tunedgemini.token_budget import estimate_tokens
+from tunedgemini.tuning_monitor import TuningMonitor
+
+
+def grid_search(space):
+    """Every combination of the values in space, a dict of name -> list."""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def log_uniform(low, high):
+    """Sampler for random_search drawing from [low, high] on a log scale."""
+    return lambda rnd: math.exp(rnd.uniform(math.log(low), math.log(high)))
+
+
+def random_search(space, n, seed=0):
+    """n distinct configs; each value is drawn from a list or a sampler(rnd)."""
+    rnd = random.Random(seed)
+    configs = []
+    for _ in range(n * 20):
+        config = {name: values(rnd) if callable(values) else rnd.choice(values) for name, values in space.items()}
+        config = {name: round(value, 4) if isinstance(value, float) else value for name, value in config.items()}
+        if config not in configs:
+            configs.append(config)
+        if len(configs) == n:
+            break
+    return configs
+
+
+def _display_name(index, hyperparameters):
+    short = {"epoch_count": "e", "batch_size": "b", "learning_rate_multiplier": "lr"}
+    parts = [f"{short.get(name, name)}{value:g}" if isinstance(value, float) else f"{short.get(name, name)}{value}"
+             for name, value in hyperparameters.items()]
+    return f"sweep {index} {' '.join(parts)}"[:40]
+
+
+class Trial:
+    """One config of a sweep: its tuning job and its evaluation so far."""
+
+    def __init__(self, index, hyperparameters, tuned_tokens):
+        self.index = index
+        self.hyperparameters = hyperparameters
+        self.tuned_tokens = tuned_tokens
+        self.model_id = None
+        self.state = "PENDING"
+        self.record = None
+        self.metrics = StreamingMetrics()
+        self.pruned_by = None
+        self.eval_seconds = 0.0
+
+    @property
+    def wall_seconds(self):
+        """Queue plus training time of the tuning job."""
+        if self.record is None or not (self.record.created and self.record.ended):
+            return None
+        return (self.record.ended - self.record.created).total_seconds()
+
+    def dominated_by(self, other):
+        if other is self or not other.metrics.n or not self.metrics.n:
+            return False
+        if self.wall_seconds is None or other.wall_seconds is None:
+            return False
+        return (other.metrics.interval()[0] > self.metrics.interval()[1]
+                and other.tuned_tokens <= self.tuned_tokens
+                and other.wall_seconds <= self.wall_seconds)
+
+
+class Sweep:
+    """Run a hyperparameter sweep of tuning jobs with a concurrent-job quota.
+
+    configs is a list of hyperparameter dicts, each overriding TUNING_CONFIG.
+    Finished models are scored on num_samples posts per class of df_test,
+    `rungs` giving the fractions of that sample after which pruning is
+    checked. price_per_million, if given, turns training tokens (examples x
+    epochs) into a cost. A ModelRegistry lets configs tuned before be reused.
+    """
+
+    def __init__(self, client, df_train, df_test, configs, base_model="gemini-1.5-flash-001",
+                 max_concurrent=2, num_samples=4, rungs=(0.25, 0.5, 1.0), eval_concurrency=8,
+                 clock=None, seed=0, prune=True, price_per_million=None, registry=None, cache=None):
+        self.client = client
+        self.base_model = base_model
+        self.max_concurrent = max_concurrent
+        self.rungs = rungs
+        self.eval_concurrency = eval_concurrency
+        self.prune = prune
+        self.price_per_million = price_per_million
+        self.registry = registry
+        self.cache = cache
+        self.monitor = TuningMonitor(client, clock=clock)
+        self.examples = tuning_examples(df_train)
+        example_tokens = sum(estimate_tokens(e["textInput"]) + estimate_tokens(e["output"]) for e in self.examples)
+
+        df_eval = sample_data(df_test, num_samples, '.*', seed=seed)
+        order = np.random.default_rng(seed).permutation(len(df_eval))
+        self.df_eval = df_eval.iloc[order].reset_index(drop=True)
+
+        self.trials = []
+        for i, hyperparameters in enumerate(configs):
+            epochs = hyperparameters.get("epoch_count", TUNING_CONFIG["epoch_count"])
+            self.trials.append(Trial(i, hyperparameters, example_tokens * epochs))
+
+    def _config(self, trial):
+        return {**TUNING_CONFIG, **trial.hyperparameters,
+                "tuned_model_display_name": _display_name(trial.index, trial.hyperparameters)}
+
+    async def _launch(self, trial):
+        config = self._config(trial)
+        fingerprint = None
+        if self.registry is not None:
+            # Same fingerprint as fine_tune with these hyperparameters.
+            fingerprint = dataset_fingerprint(self.examples, self.base_model,
+                                              {**TUNING_CONFIG, **trial.hyperparameters})
+            found = self.registry.lookup(fingerprint)
+            if found and found[1] not in FAILED_STATES:
+                trial.model_id = found[0]
+        if trial.model_id is None:
+            job = await asyncio.to_thread(start_tuning, self.client, self.examples, self.base_model, config)
+            trial.model_id = job.name
+            METRICS.count("sweep_job")
+            if self.registry is not None:
+                self.registry.register(fingerprint, job.name, job.state.name, self.base_model,
+                                       {**TUNING_CONFIG, **trial.hyperparameters})
+        trial.state = "TUNING"
+        future = self.monitor.watch(trial.model_id)
+        trial.record = self.monitor.records[trial.model_id]
+        print(f"Trial {trial.index} {trial.hyperparameters}: {trial.model_id}")
+        return future
+
+    def _dominator(self, trial):
+        for other in self.trials:
+            if trial.dominated_by(other):
+                return other
+        return None
+
+    async def _evaluate(self, trial):
+        trial.state = "EVALUATING"
+        _, predict_async = _predictors(self.client, trial.model_id, self.cache)
+        texts, truth = list(self.df_eval["Text"]), list(self.df_eval["Class Name"])
+        done = 0
+        for fraction in self.rungs:
+            stop = min(len(texts), max(done + 1, int(round(fraction * len(texts)))))
+            start = time.perf_counter()
+            predictions = await gather_ordered(texts[done:stop], predict_async, concurrency=self.eval_concurrency,
+                                               desc=f"trial {trial.index}")
+            trial.eval_seconds += time.perf_counter() - start
+            for label, prediction in zip(truth[done:stop], predictions):
+                trial.metrics.update(label, prediction)
+            done = stop
+
+            if self.prune and done < len(texts):
+                dominator = self._dominator(trial)
+                if dominator is not None:
+                    trial.pruned_by = dominator.index
+                    trial.state = "PRUNED"
+                    print(f"Trial {trial.index} pruned after {done} posts "
+                          f"({trial.metrics.summary()}), dominated by trial {dominator.index}")
+                    return
+        trial.state = "DONE"
+        print(f"Trial {trial.index} done: {trial.metrics.summary()}")
+
+    async def run(self):
+        """Tune and evaluate every config; returns the leaderboard."""
+        pending = list(self.trials)
+        tuning = {}
+        evaluating = set()
+        monitor_task = None
+        while pending or tuning or evaluating:
+            while pending and len(tuning) < self.max_concurrent:
+                trial = pending.pop(0)
+                tuning[await self._launch(trial)] = trial
+            if tuning and (monitor_task is None or monitor_task.done()):
+                monitor_task = asyncio.ensure_future(self.monitor.run())
+
+            waiting = [*tuning, *evaluating] + ([monitor_task] if tuning else [])
+            finished, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                if task is monitor_task:
+                    # Surfaces polling errors; a clean exit just means no job is active.
+                    task.result()
+                    continue
+                if task in evaluating:
+                    evaluating.discard(task)
+                    task.result()
+                    continue
+                trial = tuning.pop(task)
+                error = task.exception()
+                if error is not None:
+                    trial.state = f"ERROR: {error}"
+                elif task.result().state.name != "JOB_STATE_SUCCEEDED":
+                    trial.state = task.result().state.name
+                else:
+                    evaluating.add(asyncio.ensure_future(self._evaluate(trial)))
+        if monitor_task is not None:
+            await monitor_task
+        return self.leaderboard()
+
+    def leaderboard(self):
+        """One row per trial, best accuracy first, with the Pareto front marked."""
+        rows = []
+        for trial in self.trials:
+            low, high = trial.metrics.interval()
+            rows.append({
+                "trial": trial.index,
+                **trial.hyperparameters,
+                "model_id": trial.model_id,
+                "state": trial.state,
+                "accuracy": trial.metrics.accuracy if trial.metrics.n else float("nan"),
+                "ci_low": low,
+                "ci_high": high,
+                "n_eval": trial.metrics.n,
+                "queue_seconds": trial.record.queue_seconds() if trial.record else None,
+                "training_seconds": trial.record.training_seconds() if trial.record else None,
+                "wall_seconds": trial.wall_seconds,
+                "tuned_tokens": trial.tuned_tokens,
+                "cost": (trial.tuned_tokens * self.price_per_million / 1e6
+                         if self.price_per_million is not None else float("nan")),
+                "eval_seconds": trial.eval_seconds,
+                "pruned_by": trial.pruned_by,
+            })
+        board = pd.DataFrame(rows)
+        board["pareto"] = [self._on_front(trial) for trial in self.trials]
+        return board.sort_values(["accuracy", "wall_seconds"], ascending=[False, True]).reset_index(drop=True)
+
+    def _on_front(self, trial):
+        # Point estimates here; pruning uses the stricter interval test.
+        if not trial.metrics.n or trial.wall_seconds is None:
+            return False
+        for other in self.trials:
+            if other is trial or not other.metrics.n or other.wall_seconds is None:
+                continue
+            if (other.metrics.accuracy >= trial.metrics.accuracy and other.tuned_tokens <= trial.tuned_tokens
+                    and other.wall_seconds <= trial.wall_seconds
+                    and (other.metrics.accuracy, -other.tuned_tokens, -other.wall_seconds)
+                    != (trial.metrics.accuracy, -trial.tuned_tokens, -trial.wall_seconds)):
+                return False
+        return True
+
+
+def run_sweep(client, df_train, df_test, configs, **kwargs):
+    """Blocking wrapper around Sweep.run; prints and returns the leaderboard."""
+    sweep = Sweep(client, df_train, df_test, configs, **kwargs)
+    board = asyncio.run(sweep.run())
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(board.drop(columns=["model_id"]).to_string(index=False, float_format=lambda x: f"{x:.3g}"))
+    return board
@@ -0,0 +1,115 @@
+"""
+Trim newsgroup posts to a per-example token budget before they are sent for
+tuning or prediction.
+
+Quoted replies and signatures are dropped first, then the remainder is cut
+to max_tokens using a local token estimate, so no API call is needed to size
+a dataset.
+"""
+
+import re
+
+import numpy as np
+
+# Roughly how many characters of a single word one token covers.
+CHARS_PER_TOKEN = 4
+
+_piece_re = re.compile(r"\w+|[^\w\s]")
+_attribution_re = re.compile(r"^(In article\b.*|.*\b(writes|wrote|says)):\s*$")
+# Signatures start at a "-- " line; only treat it as one near the end.
+_MAX_SIGNATURE_LINES = 15
+
+
+def strip_quoted_replies(text):
+    """Drop ">"-quoted lines and the "In article ..., X writes:" lines above them.
+
+    An attribution line is only dropped when the next non-blank line after it
+    (and after any further attribution lines, for one split across two lines)
+    is quoted, so prose that happens to end in "says:" is kept.
+    """
+    kept = []
+    quote_follows = False
+    for line in reversed(text.split("\n")):
+        if line.lstrip().startswith(">"):
+            quote_follows = True
+            continue
+        if _attribution_re.match(line):
+            if not quote_follows:
+                kept.append(line)
+            continue
+        kept.append(line)
+        if line.strip():
+            quote_follows = False
+    return "\n".join(reversed(kept))
+
+
+def strip_signature(text):
+    lines = text.split("\n")
+    first = max(len(lines) - _MAX_SIGNATURE_LINES, 0)
+    for i in range(len(lines) - 1, first - 1, -1):
+        if lines[i].rstrip() == "--":
+            return "\n".join(lines[:i]).rstrip("\n")
+    return text
+
+
+def _piece_tokens(piece):
+    return 1 + (len(piece) - 1) // CHARS_PER_TOKEN
+
+
+def estimate_tokens(text):
+    """Local approximation of the model's token count for text."""
+    return sum(_piece_tokens(m.group()) for m in _piece_re.finditer(text))
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text after the last word or symbol that fits in max_tokens."""
+    used = 0
+    end = 0
+    for m in _piece_re.finditer(text):
+        used += _piece_tokens(m.group())
+        if used > max_tokens:
+            return text[:end]
+        end = m.end()
+    return text
+
+
+def trim_text(text, max_tokens=None, strip_quotes=True, strip_signatures=True):
+    if strip_quotes:
+        text = strip_quoted_replies(text)
+    if strip_signatures:
+        text = strip_signature(text)
+    if max_tokens is not None:
+        text = truncate_to_tokens(text, max_tokens)
+    return text
+
+
+def apply_token_budget(df, max_tokens=None, column="Text", strip_quotes=True, strip_signatures=True):
+    """Return a copy of df with `column` trimmed by trim_text."""
+    df = df.copy()
+    df[column] = [
+        trim_text(text, max_tokens, strip_quotes, strip_signatures) for text in df[column]
+    ]
+    return df
+
+
+def token_report(texts):
+    """Summary of the estimated input token volume of texts."""
+    counts = np.array([estimate_tokens(text) for text in texts], dtype=np.int64)
+    if len(counts) == 0:
+        return {"examples": 0, "total_tokens": 0, "mean_tokens": 0.0, "p95_tokens": 0, "max_tokens": 0}
+    return {
+        "examples": len(counts),
+        "total_tokens": int(counts.sum()),
+        "mean_tokens": float(counts.mean()),
+        "p95_tokens": int(np.percentile(counts, 95)),
+        "max_tokens": int(counts.max()),
+    }
+
+
+def print_token_report(texts, label="Dataset"):
+    report = token_report(texts)
+    print(
+        f"{label}: {report['examples']} examples, ~{report['total_tokens']:,} input tokens "
+        f"(mean {report['mean_tokens']:.0f}, p95 {report['p95_tokens']}, max {report['max_tokens']})"
+    )
+    return report
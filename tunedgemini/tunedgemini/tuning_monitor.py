@@ -0,0 +1,162 @@
+"""
+Async monitor for tuning jobs.
+
+One scheduler loop polls every watched job on its own adaptive interval:
+the interval resets to min_interval whenever a job changes state and backs
+off towards max_interval while it does not. Completion is exposed as an
+awaitable per job plus optional callbacks, and each job's state transitions
+are timestamped so queue time and training time can be reported separately.
+"""
+
+import asyncio
+import datetime
+
+from tunedgemini.metrics import METRICS
+
+
+class SystemClock:
+    def now(self):
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+
+class JobRecord:
+    """What the monitor has observed about one tuning job."""
+
+    def __init__(self, name, future, max_wait=None, callbacks=()):
+        self.name = name
+        self.future = future
+        self.max_wait = max_wait
+        self.callbacks = list(callbacks)
+        self.job = None
+        self.state = None
+        self.transitions = []
+        self.polls = 0
+        self.interval = None
+        self.next_poll = None
+
+    def _observed(self, state_name):
+        for name, when in self.transitions:
+            if name == state_name:
+                return when
+        return None
+
+    @property
+    def created(self):
+        if self.job is not None and self.job.create_time:
+            return self.job.create_time
+        return self.transitions[0][1] if self.transitions else None
+
+    @property
+    def started(self):
+        if self.job is not None and self.job.start_time:
+            return self.job.start_time
+        return self._observed("JOB_STATE_RUNNING")
+
+    @property
+    def ended(self):
+        if self.job is not None and self.job.end_time:
+            return self.job.end_time
+        if self.job is not None and self.job.has_ended:
+            return self.transitions[-1][1]
+        return None
+
+    def queue_seconds(self):
+        if self.created and self.started:
+            return (self.started - self.created).total_seconds()
+        return None
+
+    def training_seconds(self):
+        if self.started and self.ended:
+            return (self.ended - self.started).total_seconds()
+        return None
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "state": self.state,
+            "polls": self.polls,
+            "queue_seconds": self.queue_seconds(),
+            "training_seconds": self.training_seconds(),
+            "transitions": [(state, when.isoformat()) for state, when in self.transitions],
+        }
+
+
+class TuningMonitor:
+    """Track many tuning jobs concurrently.
+
+    Call watch() for each job from inside the event loop, then await run(),
+    which returns once every watched job has ended or timed out.
+    """
+
+    def __init__(self, client, clock=None, min_interval=10.0, max_interval=120.0, backoff=1.5):
+        self.client = client
+        self.clock = clock or SystemClock()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.records = {}
+
+    def watch(self, name, max_wait=None, on_done=None):
+        """Start tracking a job and return a future resolving to the final job.
+
+        If the job has not ended max_wait after its creation time, the future
+        fails with TimeoutError. on_done(record) is called once it resolves.
+        """
+        if name in self.records:
+            return self.records[name].future
+
+        future = asyncio.get_running_loop().create_future()
+        record = JobRecord(name, future, max_wait, [on_done] if on_done else ())
+        record.next_poll = self.clock.now()
+        record.interval = self.min_interval
+        self.records[name] = record
+        return future
+
+    def _active(self):
+        return [r for r in self.records.values() if not r.future.done()]
+
+    def _resolve(self, record, result=None, error=None):
+        if error is not None:
+            record.future.set_exception(error)
+        else:
+            record.future.set_result(result)
+        for callback in record.callbacks:
+            callback(record)
+
+    async def _poll(self, record):
+        job = await asyncio.to_thread(self.client.tunings.get, name=record.name)
+        METRICS.count("tuning_poll")
+        now = self.clock.now()
+        record.polls += 1
+        record.job = job
+
+        if job.state.name != record.state:
+            record.state = job.state.name
+            record.transitions.append((record.state, now))
+            record.interval = self.min_interval
+        else:
+            record.interval = min(record.interval * self.backoff, self.max_interval)
+        record.next_poll = now + datetime.timedelta(seconds=record.interval)
+
+        if job.has_ended:
+            self._resolve(record, result=job)
+        elif record.max_wait is not None and now - record.created > record.max_wait:
+            self._resolve(record, error=TimeoutError(f"{record.name} still {record.state} after {record.max_wait}"))
+
+    async def run(self):
+        """Poll until no watched job is still active; return the job records."""
+        while active := self._active():
+            now = self.clock.now()
+            due = [r for r in active if r.next_poll <= now]
+            if due:
+                await asyncio.gather(*(self._poll(r) for r in due))
+                continue
+            next_poll = min(r.next_poll for r in active)
+            await self.clock.sleep((next_poll - now).total_seconds())
+        return self.records
+
+    def report(self):
+        return [record.summary() for record in self.records.values()]
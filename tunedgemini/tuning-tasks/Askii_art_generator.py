@@ -5,13 +5,16 @@ This uses the Google Vertex AI approach for fine-tuning.
 """
 
 import os
-import json
 import argparse
 from pathlib import Path
 import pandas as pd
 import google.generativeai as genai
 from google.cloud import aiplatform
 
+from tunedgemini.ascii_art import stream_ascii
+from tunedgemini.ascii_grid import score_batch
+from tunedgemini.jsonl_store import JsonlStore, VertexJsonlWriter
+
 # Set up argument parser
 parser = argparse.ArgumentParser(description="Fine-tune Gemini with a simple dataset")
 parser.add_argument("--project-id", type=str, required=True, help="Google Cloud project ID")
@@ -19,6 +22,7 @@ parser.add_argument("--location", type=str, default="us-central1", help="Google
 parser.add_argument("--output-dir", type=str, default="./output", help="Output directory")
 parser.add_argument("--model", type=str, default="gemini-1.5-pro", help="Base model")
 parser.add_argument("--epochs", type=int, default=3, help="Number of training epochs")
+parser.add_argument("--tuned-model", type=str, help="Tuned model to test; the test step is simulated without it")
 args = parser.parse_args()
 
 # Create output directory
@@ -98,26 +102,14 @@ def prepare_tuning_data(dataset_path):
     """Prepare the data in the format required by Vertex AI for tuning."""
     print("Preparing tuning data...")
     
-    tuning_data = []
-    with open(dataset_path, "r") as f:
-        for line in f:
-            item = json.loads(line)
-            # Format for Vertex AI tuning
-            tuning_data.append({
-                "model_input": {
-                    "context": f"Create ASCII art based on the following description: {item['input_text']}",
-                    "examples": []
-                },
-                "model_output": {
-                    "content": item['target_text']
-                }
-            })
-    
-    # Save formatted data
+    # Stream records from the indexed store into the Vertex AI tuning format,
+    # so the corpus is never held in memory.
     tuning_file = os.path.join(args.output_dir, "tuning_data.jsonl")
-    with open(tuning_file, "w") as f:
-        for item in tuning_data:
-            f.write(json.dumps(item) + "\n")
+    with JsonlStore(dataset_path) as store, VertexJsonlWriter(
+        tuning_file, "Create ASCII art based on the following description: {}"
+    ) as writer:
+        for chunk in store.chunks(10_000):
+            writer.write_records(chunk, "input_text", "target_text")
     
     print(f"Tuning data prepared and saved to: {tuning_file}")
     return tuning_file
@@ -148,8 +140,8 @@ def finetune_model(tuning_file):
     
     return model_resource_name
 
-def test_finetuned_model(model_resource_name):
-    """Test the fine-tuned model with a few examples."""
+def test_finetuned_model(model_resource_name, dataset_path=None):
+    """Test the fine-tuned model with a few examples, scoring any with a known target."""
     print("\nTesting the (hypothetical) fine-tuned model...")
     
     test_prompts = [
@@ -158,38 +150,87 @@ def test_finetuned_model(model_resource_name):
         "Draw an airplane"
     ]
     
-    # NOTE: This is a SIMULATED test of what would happen with a fine-tuned model
-    # In a real scenario, you would load the fine-tuned model and use it
+    if args.tuned_model:
+        outputs = generate_outputs(args.tuned_model, test_prompts)
+    else:
+        outputs = simulated_outputs(test_prompts)
+
+    if dataset_path:
+        targets = find_targets(dataset_path, test_prompts)
+        scored = [prompt for prompt in test_prompts if prompt in targets]
+        scores = score_batch([outputs[p] for p in scored], [targets[p] for p in scored])
+        scores.index = scored
+        print("\nSimilarity to the training targets:")
+        print(scores.round(3).to_string())
+
+
+def find_targets(dataset_path, prompts):
+    """The first target_text for each of prompts, streamed from the JSONL file."""
+    wanted = set(prompts)
+    targets = {}
+    with JsonlStore(dataset_path) as store:
+        for chunk in store.chunks():
+            for record in chunk:
+                prompt = record["input_text"]
+                if prompt in wanted and prompt not in targets:
+                    targets[prompt] = record["target_text"]
+            if len(targets) == len(wanted):
+                break
+    return targets
+
+
+def generate_outputs(model_id, test_prompts):
+    """Stream each prompt's drawing from the tuned model, printing lines as they arrive."""
+    from google import genai as google_genai
+
+    client = google_genai.Client(vertexai=True, project=args.project_id, location=args.location)
+    outputs = {}
+    for prompt in test_prompts:
+        print(f"\nPrompt: {prompt}")
+        print("-" * 40)
+        result = stream_ascii(client, model_id, prompt.removeprefix("Draw "),
+                              on_line=lambda line: print(line, flush=True))
+        print(f"[{result.summary()}]")
+        outputs[prompt] = result.text
+    return outputs
+
+
+def simulated_outputs(test_prompts):
+    # NOTE: This is a SIMULATED test of what would happen with a fine-tuned model.
+    # Pass --tuned-model to generate with a real one.
     
     print("\nSimulated outputs from fine-tuned model:")
+    outputs = {}
     for prompt in test_prompts:
         print(f"\nPrompt: {prompt}")
         print("-" * 40)
         
         if prompt == "Draw a cat":
-            print("""
+            outputs[prompt] = """
   /\\_/\\
  ( o.o )
   > ^ <
-""")
+"""
         elif prompt == "Draw a simple house":
-            print("""
+            outputs[prompt] = """
     /\\
    /  \\
   /____\\
  |    |
  |____|
-""")
+"""
         else:
-            print("""
+            outputs[prompt] = """
      __
  ___/ /\\
 /____/  \\
     \\__/
-""")
+"""
+        print(outputs[prompt])
     
     print("\nNote: These are simulated outputs for demonstration purposes.")
-    print("In a real scenario, you would use the actual fine-tuned model to generate outputs.")
+    print("Pass --tuned-model to generate them with an actual fine-tuned model.")
+    return outputs
 
 def main():
     """Main function to run the fine-tuning demo."""
@@ -207,7 +248,7 @@ def main():
     model_resource_name = finetune_model(tuning_file)
     
     # Step 4: Test fine-tuned model
-    test_finetuned_model(model_resource_name)
+    test_finetuned_model(model_resource_name, dataset_path)
     
     print("\n" + "=" * 50)
     print("Demo completed successfully!")